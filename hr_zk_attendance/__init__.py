@@ -21,7 +21,9 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 ################################################################################
+from . import controllers
 from . import models
+from . import wizard
 
 def pre_init_check(cr):
     """Verify that required dependencies are installed before installing the module"""
@@ -21,7 +21,7 @@
 ################################################################################
 {
     'name': 'Biometric Device Integration',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.2.0',
     'category': 'Human Resources',
     'summary': "Integrating Biometric Device (Model: ZKteco uFace 202) With HR"
                "Attendance (Face + Thumb)",
@@ -46,9 +46,18 @@ Note: Requires pyzk library and network access to the device.
     },
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/biometric_device_details_views.xml',
+        'views/biometric_device_clock_log_views.xml',
+        'views/biometric_device_job_views.xml',
+        'views/biometric_device_raw_log_views.xml',
+        'views/biometric_device_sync_log_views.xml',
         'views/hr_employee_views.xml',
         'views/daily_attendance_views.xml',
+        'views/zk_unmapped_user_views.xml',
+        'views/zk_attendance_archive_views.xml',
+        'views/zk_attendance_summary_views.xml',
+        'wizard/zk_attlog_import_views.xml',
         'views/biometric_device_attendance_menus.xml',
     ],
     'images': ['static/description/banner.jpg'],
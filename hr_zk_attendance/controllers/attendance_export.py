@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import csv
+import io
+import json
+from odoo import api, fields, http
+from odoo.http import request
+from ..models.zk_machine_attendance import EXPORT_COLUMNS
+
+# Largest number of punches returned by one export call
+EXPORT_MAX_ROWS = 50000
+
+
+class AttendanceExportController(http.Controller):
+    """Bulk export of the device punches for payroll and other systems.
+
+    ``GET /hr_zk_attendance/export/punches`` streams the punches of the
+    companies of the user as JSON (default) or CSV (``format=csv``).
+    Optional filters: ``company_id``, ``address_id``, ``date_from`` and
+    ``date_to`` (UTC, ``YYYY-MM-DD HH:MM:SS``), ``duplicates=1`` and
+    ``limit`` (at most ``EXPORT_MAX_ROWS``).
+
+    Two ways of paging are offered, both independent of the table size:
+
+    * by punching time: pass the ``next_after`` value of the previous
+      answer (``<punching_time>,<id>`` of its last row) as ``after``;
+    * by creation, to fetch only the punches created since the last pull
+      whatever their time: pass ``since`` (``0,0`` for the first pull)
+      and keep the ``next_since`` of the answer for the next one.
+      Punches are delivered in the order their transactions finished, a
+      punch still being imported is held back rather than skipped.
+
+    JSON answers end with these cursors, ``next_after`` being null once
+    the export is complete. CSV answers carry no trailer, the cursors are
+    read from the ``punching_time`` (or ``change_xid``) and ``id`` of the
+    last row.
+    """
+
+    def _error(self, message, status=400):
+        """JSON error answer"""
+        return request.make_response(
+            json.dumps({'error': message}), status=status,
+            headers=[('Content-Type', 'application/json')])
+
+    @http.route('/hr_zk_attendance/export/punches', type='http',
+                auth='user', methods=['GET'], csrf=False, readonly=True)
+    def export_punches(self, format='json', company_id=None, address_id=None,
+                       date_from=None, date_to=None, after=None,
+                       since=None, duplicates=None, limit=None, **kwargs):
+        """Stream the punches matching the filters"""
+        env = request.env
+        env['zk.machine.attendance'].check_access('read')
+        if format not in ('json', 'csv'):
+            return self._error("format must be 'json' or 'csv'")
+        try:
+            company_ids = env.user.company_ids.ids
+            if company_id:
+                if int(company_id) not in company_ids:
+                    return self._error('Company not allowed', status=403)
+                company_ids = [int(company_id)]
+            address_id = int(address_id) if address_id else None
+            date_from = fields.Datetime.to_datetime(date_from) \
+                if date_from else None
+            date_to = fields.Datetime.to_datetime(date_to) if date_to else None
+            if after:
+                after_time, after_id = after.rsplit(',', 1)
+                after = (fields.Datetime.to_datetime(after_time),
+                         int(after_id))
+            if since:
+                since_xid, since_id = since.split(',')
+                since = (int(since_xid), int(since_id))
+            limit = min(int(limit), EXPORT_MAX_ROWS) if limit \
+                else EXPORT_MAX_ROWS
+        except ValueError as e:
+            return self._error('Invalid parameter: %s' % e)
+        if after and since:
+            return self._error('after and since cannot be combined')
+        export_args = {
+            'company_ids': company_ids,
+            'address_id': address_id,
+            'date_from': date_from,
+            'date_to': date_to,
+            'after': after,
+            'since': since or None,
+            'duplicates': duplicates in ('1', 'true'),
+            'limit': limit,
+        }
+        stream = self._stream_json if format == 'json' else self._stream_csv
+        content_type = 'application/json' if format == 'json' \
+            else 'text/csv; charset=utf-8'
+        return request.make_response(
+            stream(env.registry, env.uid, dict(env.context), export_args),
+            headers=[('Content-Type', content_type),
+                     ('Cache-Control', 'no-store')])
+
+    def _iter_rows(self, registry, uid, context, export_args):
+        """Read the rows in a cursor of their own: the response is sent
+        once the request cursor has been released"""
+        with registry.cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            yield from env['zk.machine.attendance'].sudo()._iter_export(
+                **export_args)
+
+    def _stream_json(self, registry, uid, context, export_args):
+        """Generate the JSON answer, rows first and cursors last"""
+        yield '{"rows": ['
+        last = None
+        count = 0
+        for row in self._iter_rows(registry, uid, context, export_args):
+            row['punching_time'] = fields.Datetime.to_string(
+                row['punching_time'])
+            row['create_date'] = fields.Datetime.to_string(
+                row['create_date'])
+            yield (',\n' if last else '\n') + json.dumps(row)
+            last = row
+            count += 1
+        if export_args['since'] is not None:
+            next_after = None
+            next_since = '%s,%s' % ((last['change_xid'], last['id']) if last
+                                    else export_args['since'])
+        else:
+            next_after = '%s,%s' % (last['punching_time'], last['id']) \
+                if last and count == export_args['limit'] else None
+            next_since = None
+        yield '\n], "count": %s, "next_after": %s, "next_since": %s}\n' % (
+            count, json.dumps(next_after), json.dumps(next_since))
+
+    def _stream_csv(self, registry, uid, context, export_args):
+        """Generate the CSV answer, flushed every hundred rows"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for index, row in enumerate(self._iter_rows(
+                registry, uid, context, export_args), 1):
+            row['punching_time'] = fields.Datetime.to_string(
+                row['punching_time'])
+            row['create_date'] = fields.Datetime.to_string(
+                row['create_date'])
+            writer.writerow([row[column] for column in EXPORT_COLUMNS])
+            if index % 100 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
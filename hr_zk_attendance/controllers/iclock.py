@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import logging
+from odoo import http
+from odoo.http import request
+from ..tools.zk_push import handshake_options, parse_attlog
+
+_logger = logging.getLogger(__name__)
+
+
+class IclockController(http.Controller):
+    """Endpoints of the ZKTeco push protocol (ADMS / iClock).
+
+    Devices are matched on ``biometric.device.details`` by serial number,
+    or by IP address for devices without one, and must have
+    ``push_enabled`` set. Requests must come from the device IP address
+    or carry the ``push_token`` of the device as ``token`` parameter. Posted punches are only appended to
+    zk.push.punch before answering, the import runs in a cron.
+    """
+
+    def _get_device(self):
+        """Return the push-enabled device making the request"""
+        return request.env['biometric.device.details'].sudo()._find_push_device(
+            request.params.get('SN'), request.httprequest.remote_addr,
+            request.params.get('token'))
+
+    def _reply(self, body, status=200):
+        """Plain text answer, as expected by the device firmware"""
+        return request.make_response(body, status=status, headers=[
+            ('Content-Type', 'text/plain')])
+
+    @http.route('/iclock/cdata', type='http', auth='none', methods=['GET'],
+                csrf=False, save_session=False)
+    def iclock_handshake(self, SN=None, **kwargs):
+        """Send the push options to a device starting up"""
+        if not self._get_device():
+            _logger.warning("Push handshake from unknown device %s (%s)", SN,
+                            request.httprequest.remote_addr)
+            return self._reply('Unknown device', status=404)
+        return self._reply(handshake_options(SN))
+
+    @http.route('/iclock/cdata', type='http', auth='none', methods=['POST'],
+                csrf=False, save_session=False)
+    def iclock_upload(self, SN=None, table=None, **kwargs):
+        """Buffer the attendance records posted by a device
+
+        Other tables (operation log, photos, user info) are acknowledged
+        and ignored.
+        """
+        device = self._get_device()
+        if not device:
+            _logger.warning("Push upload from unknown device %s (%s)", SN,
+                            request.httprequest.remote_addr)
+            return self._reply('Unknown device', status=404)
+        if table != 'ATTLOG':
+            return self._reply('OK')
+        body = request.httprequest.get_data().decode('utf-8', errors='ignore')
+        rows, invalid = parse_attlog(body)
+        if invalid:
+            _logger.warning("Device %s pushed %s malformed attendance lines",
+                            device.name, invalid)
+        request.env['zk.push.punch'].sudo()._buffer_rows(device, rows)
+        return self._reply('OK: %s' % len(rows))
+
+    @http.route('/iclock/getrequest', type='http', auth='none',
+                methods=['GET'], csrf=False, save_session=False)
+    def iclock_getrequest(self, SN=None, **kwargs):
+        """Command polling of the device, no command is ever queued"""
+        return self._reply('OK')
+
+    @http.route('/iclock/devicecmd', type='http', auth='none',
+                methods=['POST'], csrf=False, save_session=False)
+    def iclock_devicecmd(self, SN=None, **kwargs):
+        """Result of a device command, acknowledged"""
+        return self._reply('OK')
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+
+
+def migrate(cr, version):
+    """Drop the single-column indexes of zk_machine_attendance replaced by
+    the composite indexes created in ``ZkMachineAttendance.init``"""
+    for column in ('employee_id', 'check_in', 'check_out', 'device_id_num',
+                   'punching_time', 'address_id', 'company_id', 'device_id'):
+        cr.execute('DROP INDEX IF EXISTS "zk_machine_attendance_%s_index"'
+                   % column)
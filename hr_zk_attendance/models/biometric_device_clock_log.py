@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import bisect
+from datetime import timedelta
+from odoo import api, fields, models, tools
+from .biometric_device_sync_log import DEFAULT_SYNC_LOG_DAYS
+
+
+class BiometricDeviceClockLog(models.Model):
+    """Clock drift measured on the biometric devices"""
+    _name = 'biometric.device.clock.log'
+    _description = 'Biometric Device Clock Log'
+    _order = 'create_date desc, id desc'
+    _rec_name = 'device_id'
+
+    device_id = fields.Many2one('biometric.device.details', string='Device',
+                                required=True, ondelete='cascade',
+                                help='Device whose clock was read')
+    company_id = fields.Many2one(related='device_id.company_id', store=True,
+                                 string='Company')
+    drift = fields.Float(string='Drift (s)', aggregator='avg',
+                         help='Device clock minus server time, in seconds; '
+                              'positive when the device is ahead')
+    exceeded = fields.Boolean(string='Beyond Threshold',
+                              help='The drift exceeded the tolerance of the '
+                                   'device')
+    corrected = fields.Boolean(string='Corrected',
+                               help='The device clock was set after the '
+                                    'measure')
+    error = fields.Text(string='Error', help='Reason the clock could not '
+                                             'be read or set')
+
+    def init(self):
+        """Index the history read per device in time order"""
+        tools.create_index(self.env.cr, 'biometric_device_clock_log_device_date_index',
+                           self._table, ['device_id', 'create_date'])
+
+    @api.model
+    def _get_suspect_checker(self, device, since):
+        """Return a predicate telling whether a punch of the device was
+        recorded while its clock was off.
+
+        A punch is suspect when the first clock check after it found a
+        drift beyond the threshold, or, for punches after the last check,
+        when that check found such a drift and could not correct it.
+
+        :param device: biometric.device.details record
+        :param since: UTC datetime of the oldest punch to check
+        :return: callable taking a UTC punch time
+        """
+        logs = self.search_fetch([
+            ('device_id', '=', device.id), ('error', '=', False),
+            ('create_date', '>=', since - timedelta(days=1)),
+        ], ['create_date', 'exceeded', 'corrected'], order='create_date, id')
+        dates = [log.create_date for log in logs]
+        flags = [(log.exceeded, log.corrected) for log in logs]
+        if not any(exceeded for exceeded, _corrected in flags):
+            return lambda punch_time: False
+
+        def is_suspect(punch_time):
+            index = bisect.bisect_left(dates, punch_time)
+            if index < len(dates):
+                return flags[index][0]
+            exceeded, corrected = flags[-1]
+            return exceeded and not corrected
+        return is_suspect
+
+    @api.autovacuum
+    def _gc_clock_logs(self):
+        """Remove the history older than the
+        ``hr_zk_attendance.sync_log_days`` system parameter"""
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_zk_attendance.sync_log_days', DEFAULT_SYNC_LOG_DAYS))
+        self.search([
+            ('create_date', '<', fields.Datetime.now() - timedelta(days=days)),
+        ]).unlink()
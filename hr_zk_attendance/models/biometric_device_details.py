@@ -19,17 +19,281 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 ################################################################################
+import contextlib
 import datetime
+import hmac
+import json
 import logging
+import time
+import zlib
+from datetime import timedelta
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pytz
+from psycopg2.errors import InFailedSqlTransaction
 from odoo import api, fields, models, _
+from odoo.addons.base.models.res_partner import _tz_get
 from odoo.exceptions import UserError, ValidationError
+from ..tools import zk_pool
+from ..tools.zk_file import ParseStats, iter_file_records
+from ..tools.zk_probe import probe
+from ..tools.zk_tz import get_timezone, to_utc
+from ..tools.zk_stream import (count_records, has_unknown_users,
+                               iter_attendance_batches,
+                               read_attendance_buffer)
 
 _logger = logging.getLogger(__name__)
-try:
-    from zk import ZK, const
-except ImportError:
-    _logger.error("Please Install pyzk library.")
+
+# Number of punches written per INSERT statement during a bulk import
+IMPORT_CHUNK_SIZE = 1000
+# Default number of device records decoded and imported per batch
+DEFAULT_IMPORT_BATCH_SIZE = 5000
+# Default number of devices fetched concurrently by cron_download
+DEFAULT_SYNC_WORKERS = 8
+# Number of days of sync history summarized on the device
+SYNC_STATS_DAYS = 30
+# Default timeout in seconds of the reachability probe
+DEFAULT_PROBE_TIMEOUT = 2.0
+# Seconds a device is skipped after its circuit opens, doubled on every
+# further failure up to the maximum
+CIRCUIT_BASE_DELAY = 300
+CIRCUIT_MAX_DELAY = 86400
+# First key of the PostgreSQL advisory locks taken on devices being synced,
+# the second key being the device id
+SYNC_LOCK_NAMESPACE = zlib.crc32(b'biometric.device.details.sync') & 0x7fffffff
+# Default age in hours after which the user list snapshot of a device is
+# read again even though its counters did not change
+DEFAULT_USER_SNAPSHOT_HOURS = 24
+
+# Enrolled user as kept in the user list snapshot of a device, with the
+# attributes of pyzk ``User`` records used by the import
+SnapshotUser = namedtuple('SnapshotUser', ['uid', 'user_id', 'name'])
+
+
+def user_list_key(conn):
+    """Return the change indicator of the user list of a device: its
+    user, fingerprint, face and card counts, as refreshed by
+    ``read_sizes``"""
+    return ':'.join(str(getattr(conn, attr, 0) or 0)
+                    for attr in ('users', 'fingers', 'faces', 'cards'))
+
+
+def record_time(data, record_size, position, tz_name, dst_policy):
+    """Return the UTC time of one record of a raw attendance log
+
+    :param data: log bytes as returned by :func:`read_attendance_buffer`
+    :param record_size: size of one record in bytes
+    :param position: index of the record, which must exist
+    :param tz_name: timezone of the device
+    :param dst_policy: see :data:`..tools.zk_tz.DST_POLICIES`
+    :return: naive UTC datetime
+    """
+    record = next(iter_attendance_batches(data, record_size, [], 1, position))[0]
+    return to_utc([record.timestamp], tz_name, dst_policy)[0]
+
+
+def is_log_replaced(data, record_size, count, last_time, tz_name, dst_policy):
+    """Tell whether a device log no longer starts with the records
+    imported so far: shorter than the watermark, or cleared and refilled
+    past it, the record before the watermark then having another time
+
+    :param count: watermark, number of records already imported
+    :param last_time: UTC time of the record before the watermark
+    :return: True when the whole log must be imported again
+    """
+    if count_records(data, record_size) < count:
+        return True
+    if not count or not last_time:
+        return False
+    return record_time(data, record_size, count - 1, tz_name,
+                       dst_policy) != last_time
+
+
+def fetch_device_logs(params):
+    """Read the users and the attendance log of a device.
+
+    Runs in the worker threads of :meth:`BiometricDeviceDetails.cron_download`
+    and therefore must not touch the ORM: everything it needs comes from
+    ``params`` as built by :meth:`BiometricDeviceDetails._get_sync_params`.
+    Unless a session to the device is already open, a short reachability
+    probe runs first and a device that does not answer fails at once,
+    without retries. The user list is only read when the counters of the
+    device no longer match ``params['users_key']``, the key of the
+    snapshot stored on the device, and a new record of a user missing
+    from ``params['snapshot']`` forces it to be read anyway. Failed
+    attempts are retried with an exponential backoff.
+
+    :param params: dict of plain connection and retry settings
+    :return: dict with ``users`` (None when the snapshot is still
+        valid), their ``users_key`` and the raw attendance ``log`` (see
+        :func:`read_attendance_buffer`) on success or ``error`` on
+        failure, plus the number of ``attempts``, the ``connect_time``
+        and ``fetch_time`` of the last attempt and the ``total_time``
+        in seconds
+    """
+    start_time = time.perf_counter()
+    settings = params['settings']
+    if params.get('probe_timeout') and not zk_pool.POOL.is_open(params['key']):
+        reason = probe(settings['ip'], settings['port'], settings['force_udp'],
+                       params['probe_timeout'])
+        if reason:
+            _logger.info("Device %s is unreachable: %s", params['name'], reason)
+            return {'attempts': 1, 'error': 'Unreachable: %s' % reason,
+                    'total_time': round(time.perf_counter() - start_time, 3)}
+    result = {}
+    for attempt in range(params['retries'] + 1):
+        if attempt:
+            time.sleep(params['retry_delay'] * 2 ** (attempt - 1))
+        result = {'attempts': attempt + 1}
+        step_time = time.perf_counter()
+        try:
+            with zk_pool.POOL.connection(params['key'], params['settings'],
+                                         params['ttl']) as conn:
+                result['connect_time'] = round(time.perf_counter() - step_time, 3)
+                step_time = time.perf_counter()
+                conn.disable_device()
+                try:
+                    conn.read_sizes()
+                    result['users_key'] = user_list_key(conn)
+                    result['users'] = None
+                    if result['users_key'] != params.get('users_key'):
+                        result['users'] = conn.get_users()
+                    result['log'] = read_attendance_buffer(conn)
+                    if result['users'] is None:
+                        data, record_size = result['log']
+                        start = params.get('start', 0)
+                        if is_log_replaced(data, record_size, start,
+                                           params.get('last_record_time'),
+                                           params.get('tz'),
+                                           params.get('dst_policy')):
+                            start = 0
+                        if has_unknown_users(data, record_size,
+                                             params.get('snapshot') or [],
+                                             start):
+                            # same number of users, but not the same users
+                            result['users'] = conn.get_users()
+                finally:
+                    conn.enable_device()
+                result['fetch_time'] = round(time.perf_counter() - step_time, 3)
+            break
+        except Exception as e:
+            _logger.warning("Attempt %s to fetch device %s failed: %s",
+                            attempt + 1, params['name'], e)
+            result['error'] = str(e) or e.__class__.__name__
+    result['total_time'] = round(time.perf_counter() - start_time, 3)
+    return result
+
+
+def check_device_clock(params, tz_name, dst_policy, threshold, correct):
+    """Measure the clock drift of a device and correct it when needed.
+
+    Runs in the worker threads of :meth:`BiometricDeviceDetails.cron_check_clocks`
+    without ORM. The device time, in the device timezone, is compared
+    with the server UTC time at the middle of the read.
+
+    :param params: dict of plain connection settings, see
+        :meth:`BiometricDeviceDetails._get_sync_params`
+    :param tz_name: timezone of the device clock
+    :param dst_policy: key of :data:`..tools.zk_tz.DST_POLICIES`
+    :param threshold: tolerated drift in seconds
+    :param correct: set the device clock when the drift exceeds the
+        threshold
+    :return: dict with the ``drift`` in seconds, whether it ``exceeded``
+        the threshold and was ``corrected``, or the ``error``
+    """
+    result = {'drift': 0.0, 'exceeded': False, 'corrected': False}
+    try:
+        with zk_pool.POOL.connection(params['key'], params['settings'],
+                                     params['ttl']) as conn:
+            before = datetime.datetime.utcnow()
+            device_time = conn.get_time()
+            after = datetime.datetime.utcnow()
+            device_utc = to_utc([device_time], tz_name, dst_policy)[0]
+            server_utc = before + (after - before) / 2
+            result['drift'] = round((device_utc - server_utc).total_seconds(), 1)
+            result['exceeded'] = abs(result['drift']) > threshold
+            if result['exceeded'] and correct:
+                conn.set_time(pytz.utc.localize(datetime.datetime.utcnow())
+                              .astimezone(get_timezone(tz_name)))
+                result['corrected'] = True
+    except Exception as e:
+        _logger.warning("Checking the clock of device %s failed: %s",
+                        params['name'], e)
+        result['error'] = str(e) or e.__class__.__name__
+    return result
+
+
+def device_user_name(name):
+    """Return a name as stored by the device, at most 24 bytes"""
+    return (name or '').encode(errors='ignore')[:24].decode(errors='ignore')
+
+
+def push_device_users(params, wanted, removable):
+    """Apply the difference between the employees and the users of a
+    device.
+
+    Runs in the worker threads of
+    :meth:`BiometricDeviceDetails.action_push_employees`, without ORM.
+    The user list is read once in a single session with the device
+    disabled, then only missing or changed users are written and the
+    removable ones deleted. Device uids are allocated locally and passed
+    explicitly, so pyzk does not re-read the user list for every call.
+
+    :param params: dict of plain connection settings, see
+        :meth:`BiometricDeviceDetails._get_sync_params`
+    :param wanted: dict of user id to ``(name, card)`` expected on the
+        device
+    :param removable: set of user ids to delete from the device
+    :return: dict with the ``added``, ``updated``, ``removed`` and
+        ``unchanged`` counts, the per-user ``failures`` and the ``error``
+        preventing the push if any
+    """
+    result = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0,
+              'failures': []}
+    start_time = time.perf_counter()
+    try:
+        with zk_pool.POOL.connection(params['key'], params['settings'],
+                                     params['ttl']) as conn:
+            conn.disable_device()
+            try:
+                users = {user.user_id: user for user in conn.get_users()}
+                next_uid = max((user.uid for user in users.values()),
+                               default=0) + 1
+                for user_id, (name, card) in wanted.items():
+                    user = users.get(user_id)
+                    name = device_user_name(name)
+                    if user and user.name == name and int(user.card or 0) == card:
+                        result['unchanged'] += 1
+                        continue
+                    if user:
+                        uid, key = user.uid, 'updated'
+                    else:
+                        uid, key = next_uid, 'added'
+                        next_uid += 1
+                    try:
+                        conn.set_user(
+                            uid=uid, name=name,
+                            privilege=user.privilege if user else 0,
+                            password=user.password if user else '',
+                            group_id=user.group_id if user else '',
+                            user_id=user_id, card=card)
+                        result[key] += 1
+                    except Exception as e:
+                        result['failures'].append((user_id, str(e)))
+                for user_id in removable & set(users):
+                    try:
+                        conn.delete_user(uid=users[user_id].uid)
+                        result['removed'] += 1
+                    except Exception as e:
+                        result['failures'].append((user_id, str(e)))
+            finally:
+                conn.enable_device()
+    except Exception as e:
+        _logger.warning("Pushing employees to device %s failed: %s",
+                        params['name'], e)
+        result['error'] = str(e) or e.__class__.__name__
+    result['total_time'] = round(time.perf_counter() - start_time, 3)
+    return result
 
 
 class BiometricDeviceDetails(models.Model):
@@ -48,6 +312,181 @@ class BiometricDeviceDetails(models.Model):
                                default=lambda self: self.env.company.id,
                                help='Current Company')
     active = fields.Boolean(default=True)
+    serial_number = fields.Char(
+        string='Serial Number', copy=False,
+        help='Serial number the device reports in the push protocol')
+    push_enabled = fields.Boolean(
+        string='Accept Pushed Punches', default=False,
+        help='Accept the punches the device sends to /iclock/cdata through '
+             'the ZKTeco push protocol (ADMS), matched by serial number or '
+             'else by IP address')
+    push_token = fields.Char(
+        string='Push Token', copy=False,
+        groups='hr_attendance.group_hr_attendance_manager',
+        help='Secret the device sends as the token parameter of its push '
+             'requests, needed when its requests do not come from the '
+             'device IP address, e.g. behind NAT. Without it pushed '
+             'requests are only accepted from the device IP address.')
+    connection_timeout = fields.Integer(
+        string='Timeout', default=15,
+        help='Socket timeout in seconds for the communication with the '
+             'device')
+    device_password = fields.Integer(
+        string='Communication Key', default=0,
+        help='Communication key (password) configured on the device')
+    force_udp = fields.Boolean(
+        string='Use UDP', default=False,
+        help='Talk to the device over UDP instead of TCP')
+    omit_ping = fields.Boolean(
+        string='Skip Ping', default=False,
+        help='Do not ping the device before connecting, for networks '
+             'that block ICMP')
+    tz = fields.Selection(
+        _tz_get, string='Timezone',
+        help='Timezone of the device clock, used to convert the punches to '
+             'UTC and to set the device time. Falls back to the timezone of '
+             'the current user when empty.')
+    dst_policy = fields.Selection(
+        [('earliest', 'Earliest Instant'), ('latest', 'Latest Instant')],
+        string='DST Ambiguity', default='earliest', required=True,
+        help='How to convert punches at a local time that is repeated or '
+             'skipped by a daylight saving change: as the earliest or the '
+             'latest of the possible UTC instants')
+    unknown_user_policy = fields.Selection(
+        [('create', 'Create Employees'), ('queue', 'Queue for Review')],
+        string='Unknown Users', default='create', required=True,
+        help='What to do with users enrolled on the device that are not '
+             'linked to an employee: create the employees automatically, '
+             'or queue them for review and skip their punches until they '
+             'are mapped')
+    session_ttl = fields.Integer(
+        string='Session Idle Time', default=600,
+        help='Seconds an authenticated session to the device is kept open '
+             'for reuse by later actions and scheduled downloads. Use 0 to '
+             'disconnect after every action.')
+    import_batch_size = fields.Integer(
+        string='Import Batch Size', default=DEFAULT_IMPORT_BATCH_SIZE,
+        help='Number of device records decoded and imported at a time. '
+             'Scheduled downloads commit after every batch.')
+    keep_raw_logs = fields.Boolean(
+        string='Keep Raw Logs', default=True,
+        help='Store the new raw records of every download, compressed, so '
+             'that they can be replayed without the device')
+    sync_retries = fields.Integer(
+        string='Retries', default=2,
+        help='Number of extra attempts of the scheduled download when the '
+             'device cannot be read')
+    sync_retry_delay = fields.Float(
+        string='Retry Delay', default=2.0,
+        help='Seconds to wait before the first retry, doubled on every '
+             'further retry')
+    retention_days = fields.Integer(
+        string='Retention (days)', default=0,
+        help='Punches of this device older than this number of days are '
+             'purged from Odoo once they are imported and paired into '
+             'attendances. Use 0 to keep every punch.')
+    last_punch_time = fields.Datetime(
+        string='Last Imported Punch', readonly=True, copy=False,
+        help='Time of the last device log record covered by the import. '
+             'When the record at that position has another time the log '
+             'was cleared and refilled, and the whole log is imported '
+             'again.')
+    last_record_count = fields.Integer(
+        string='Imported Log Size', readonly=True, copy=False,
+        help='Number of records in the device log at the last import. '
+             'Only records past this position are processed on the next '
+             'download; a smaller device log triggers a full resync.')
+    last_clear_date = fields.Datetime(
+        string='Last Log Clear', readonly=True, copy=False,
+        help='Date the attendance log of the device was last cleared')
+    last_sync_date = fields.Datetime(
+        string='Last Sync', readonly=True, copy=False,
+        help='Date of the last scheduled download')
+    last_sync_state = fields.Selection(
+        [('success', 'Success'), ('failed', 'Failed')],
+        string='Last Sync Status', readonly=True, copy=False,
+        help='Result of the last scheduled download')
+    last_sync_message = fields.Char(
+        string='Last Sync Result', readonly=True, copy=False,
+        help='Summary or error of the last scheduled download')
+    job_ids = fields.One2many('biometric.device.job', 'device_id',
+                              string='Jobs')
+    max_clock_drift = fields.Integer(
+        string='Clock Tolerance (s)', default=60,
+        help='Largest clock drift, in seconds, tolerated before the device '
+             'clock is corrected and its punches are flagged as suspect')
+    auto_correct_clock = fields.Boolean(
+        string='Correct Clock', default=True,
+        help='Set the device clock when the scheduled check finds a drift '
+             'beyond the tolerance')
+    clock_drift = fields.Float(
+        string='Clock Drift (s)', readonly=True, copy=False,
+        help='Drift found by the last clock check, positive when the '
+             'device is ahead')
+    clock_checked_date = fields.Datetime(
+        string='Clock Checked', readonly=True, copy=False,
+        help='Date of the last clock check')
+    clock_log_ids = fields.One2many('biometric.device.clock.log', 'device_id',
+                                    string='Clock History')
+    circuit_threshold = fields.Integer(
+        string='Failures Before Pause', default=3,
+        help='Consecutive failed downloads after which the scheduled jobs '
+             'skip the device and only retry it on an exponential schedule')
+    circuit_state = fields.Selection(
+        [('closed', 'Online'), ('open', 'Paused')], string='Availability',
+        default='closed', required=True, readonly=True, copy=False,
+        help='Paused devices are skipped by the scheduled jobs until their '
+             'next retry')
+    failure_count = fields.Integer(
+        string='Consecutive Failures', readonly=True, copy=False)
+    circuit_retry_at = fields.Datetime(
+        string='Next Retry', readonly=True, copy=False,
+        help='Date from which a paused device is tried again')
+    last_failure_reason = fields.Char(
+        string='Last Failure', readonly=True, copy=False)
+    user_snapshot = fields.Text(
+        string='User List Snapshot', readonly=True, copy=False,
+        help='Enrolled users of the device as JSON (uid, user id, name), '
+             'reused by the downloads while the device counters are '
+             'unchanged')
+    user_snapshot_key = fields.Char(
+        string='User List Key', readonly=True, copy=False,
+        help='User, fingerprint, face and card counts of the device when '
+             'the snapshot was taken')
+    user_snapshot_date = fields.Datetime(
+        string='User List Read', readonly=True, copy=False)
+    last_push_date = fields.Datetime(
+        string='Last Employee Push', readonly=True, copy=False,
+        help='Date employees were last pushed to the device')
+    last_push_message = fields.Char(
+        string='Last Employee Push Result', readonly=True, copy=False,
+        help='Changes applied by the last employee push, or its error')
+    sync_log_ids = fields.One2many('biometric.device.sync.log', 'device_id',
+                                   string='Sync History')
+    sync_count = fields.Integer(
+        string='Syncs', compute='_compute_sync_stats',
+        help='Downloads over the last 30 days')
+    sync_failure_rate = fields.Float(
+        string='Failure Rate (%)', compute='_compute_sync_stats',
+        help='Share of failed downloads over the last 30 days')
+    avg_connect_time = fields.Float(
+        string='Avg Connect Time (s)', compute='_compute_sync_stats',
+        help='Average connection time over the last 30 days')
+    avg_fetch_time = fields.Float(
+        string='Avg Fetch Time (s)', compute='_compute_sync_stats',
+        help='Average device read time over the last 30 days')
+    avg_import_time = fields.Float(
+        string='Avg DB Write Time (s)', compute='_compute_sync_stats',
+        help='Average import time over the last 30 days')
+    records_imported_30d = fields.Integer(
+        string='Imported (30 days)', compute='_compute_sync_stats',
+        help='Records imported over the last 30 days')
+
+    _sql_constraints = [
+        ('unique_serial_number',
+         'UNIQUE(serial_number)',
+         'Another device already has this serial number!')
+    ]
 
     def device_connect(self, zk):
         """Function for connecting the device with Odoo"""
@@ -58,239 +497,1064 @@ class BiometricDeviceDetails(models.Model):
             _logger.error("Connection error: %s", str(e))
             return False
 
+    def _compute_sync_stats(self):
+        """Summarize the sync history of the last days per device"""
+        domain = [
+            ('device_id', 'in', self.ids),
+            ('create_date', '>=', fields.Datetime.now() - timedelta(days=SYNC_STATS_DAYS)),
+        ]
+        SyncLog = self.env['biometric.device.sync.log']
+        stats = {device: (count, connect, fetch, write, imported)
+                 for device, count, connect, fetch, write, imported
+                 in SyncLog._read_group(
+                     domain, ['device_id'],
+                     ['__count', 'connect_time:avg', 'fetch_time:avg',
+                      'import_time:avg', 'records_imported:sum'])}
+        failures = dict(SyncLog._read_group(
+            domain + [('state', '=', 'failed')], ['device_id'], ['__count']))
+        for device in self:
+            count, connect, fetch, write, imported = stats.get(
+                device, (0, 0.0, 0.0, 0.0, 0))
+            device.sync_count = count
+            device.sync_failure_rate = 100.0 * failures.get(device, 0) / count if count else 0.0
+            device.avg_connect_time = connect or 0.0
+            device.avg_fetch_time = fetch or 0.0
+            device.avg_import_time = write or 0.0
+            device.records_imported_30d = imported or 0
+
+    def action_view_sync_logs(self):
+        """Open the sync history of the device"""
+        self.ensure_one()
+        action = self.env['ir.actions.act_window']._for_xml_id(
+            'hr_zk_attendance.biometric_device_sync_log_action')
+        action['domain'] = [('device_id', '=', self.id)]
+        action['context'] = {'default_device_id': self.id}
+        return action
+
+    def _queue_job(self, job_type):
+        """Queue an operation on the device for the background job runner
+
+        :param job_type: operation, see ``biometric.device.job``
+        :return: notification action with the reference of the job
+        """
+        self.ensure_one()
+        job, created = self.env['biometric.device.job'].sudo()._enqueue(
+            self, job_type)
+        if created:
+            message = _('%(job)s queued, it will run in the background',
+                        job=job.display_name)
+        else:
+            message = _('%(job)s is already queued for this device',
+                        job=job.display_name)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': message,
+                'type': 'info' if created else 'warning',
+                'sticky': False,
+            }
+        }
+
+    def action_queue_download(self):
+        """Queue the download of the attendance of the device"""
+        return self._queue_job('download')
+
+    def action_queue_clear(self):
+        """Queue the clearing of the attendance of the device"""
+        return self._queue_job('clear')
+
+    def action_queue_restart(self):
+        """Queue the restart of the device"""
+        return self._queue_job('restart')
+
+    def action_view_jobs(self):
+        """Open the background jobs of the device"""
+        self.ensure_one()
+        action = self.env['ir.actions.act_window']._for_xml_id(
+            'hr_zk_attendance.biometric_device_job_action')
+        action['domain'] = [('device_id', '=', self.id)]
+        return action
+
+    def _get_connection_settings(self):
+        """Return the ``ZK`` constructor arguments of the device"""
+        self.ensure_one()
+        return {
+            'ip': self.device_ip,
+            'port': self.port_number,
+            'timeout': self.connection_timeout or 15,
+            'password': self.device_password or 0,
+            'force_udp': self.force_udp,
+            'ommit_ping': self.omit_ping,
+        }
+
+    @api.model
+    def _find_push_device(self, serial_number, ip_address, token=None):
+        """Return the device accepting pushed punches with the given
+        serial number, or else with the given IP address.
+
+        The serial number is printed on the device and sent in clear, so
+        it does not identify the sender: a device found by serial number
+        is only returned when the request comes from its IP address or
+        carries its ``push_token``.
+        """
+        device = self.browse()
+        if serial_number:
+            device = self.search([('push_enabled', '=', True),
+                                  ('serial_number', '=', serial_number)], limit=1)
+            if device and device.device_ip != ip_address and not (
+                    device.push_token and token
+                    and hmac.compare_digest(device.push_token, token)):
+                _logger.warning("Push request for device %s from %s refused: "
+                                "address and token do not match",
+                                device.name, ip_address)
+                return self.browse()
+        if not device and ip_address:
+            device = self.search([('push_enabled', '=', True),
+                                  ('serial_number', '=', False),
+                                  ('device_ip', '=', ip_address)], limit=1)
+        return device
+
+    def _get_device_tz(self):
+        """Name of the timezone of the device clock"""
+        self.ensure_one()
+        return self.tz or self.env.context.get('tz') or self.env.user.tz or 'UTC'
+
+    def _get_session_key(self):
+        """Key of the device in the connection pool of the worker"""
+        self.ensure_one()
+        return self.env.cr.dbname, self.id
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Context manager returning a connection to the device.
+
+        Sessions are shared through the per-process pool of
+        :mod:`..tools.zk_pool`, which reuses an open session while it is
+        younger than ``session_ttl`` and still answers a health check.
+        """
+        self.ensure_one()
+        if zk_pool.ZK is None:
+            raise UserError(_("Pyzk module not Found. Please install it with 'pip3 install pyzk'."))
+        with zk_pool.POOL.connection(self._get_session_key(),
+                                     self._get_connection_settings(),
+                                     self.session_ttl) as conn:
+            yield conn
+
     def action_test_connection(self):
         """Checking the connection status"""
         self.ensure_one()
-        zk = ZK(self.device_ip, port=self.port_number, timeout=30,
-                password=False, ommit_ping=False)
         try:
-            conn = self.device_connect(zk)
-            if conn:
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'message': _('Successfully Connected'),
-                        'type': 'success',
-                        'sticky': False,
-                    }
-                }
-            else:
-                raise ValidationError(_("Could not connect to the device. Please check the device configuration."))
+            with self._connect():
+                pass
         except Exception as error:
             raise ValidationError(_(
                 "Connection failed: %s", str(error)))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('Successfully Connected'),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
 
     def action_set_timezone(self):
-        """Function to set user's timezone to device"""
+        """Function to set the device clock to the time of its timezone"""
         self.ensure_one()
-        machine_ip = self.device_ip
-        zk_port = self.port_number
         try:
-            zk = ZK(machine_ip, port=zk_port, timeout=15,
-                    password=0, force_udp=False, ommit_ping=False)
-        except NameError:
-            raise UserError(
-                _("Pyzk module not Found. Please install it with 'pip3 install pyzk'."))
-        
-        conn = self.device_connect(zk)
-        if conn:
-            try:
-                user_tz = self.env.context.get('tz') or self.env.user.tz or 'UTC'
-                user_timezone = pytz.timezone(user_tz)
-                user_timezone_time = pytz.utc.localize(fields.Datetime.now()).astimezone(user_timezone)
-                conn.set_time(user_timezone_time)
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'message': _('Successfully Set the Time'),
-                        'type': 'success',
-                        'sticky': False,
-                    }
-                }
-            except Exception as e:
-                raise UserError(_("Failed to set timezone: %s", str(e)))
-            finally:
-                conn.disconnect()
-        else:
-            raise UserError(_("Please Check the Connection"))
+            with self._connect() as conn:
+                device_timezone = get_timezone(self._get_device_tz())
+                device_time = pytz.utc.localize(fields.Datetime.now()).astimezone(device_timezone)
+                conn.set_time(device_time)
+        except Exception as e:
+            raise UserError(_("Failed to set timezone: %s", str(e)))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('Successfully Set the Time'),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
 
     def action_clear_attendance(self):
-        """Method to clear record from the zk.machine.attendance model and from the device"""
+        """Clear the attendance log of the device once it is fully
+        imported, and purge the punches of the device past the retention"""
         self.ensure_one()
         try:
-            zk = ZK(self.device_ip, port=self.port_number, timeout=30,
-                    password=0, force_udp=False, ommit_ping=False)
-        except NameError:
-            raise UserError(_("Please install pyzk with 'pip3 install pyzk'."))
-        
-        conn = self.device_connect(zk)
-        if not conn:
-            raise UserError(_('Unable to connect to Attendance Device. Please use Test Connection button to verify.'))
-        
-        try:
-            conn.enable_device()
-            clear_data = conn.get_attendance()
-            if clear_data:
-                conn.clear_attendance()
-                self.env.cr.execute("DELETE FROM zk_machine_attendance")
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'message': _('Successfully cleared attendance data'),
-                        'type': 'success',
-                        'sticky': False,
-                    }
-                }
-            else:
-                raise UserError(_('No attendance records found to clear.'))
+            cleared = self._clear_device_log()
+            purged = self._purge_attendance()
         except Exception as error:
             raise ValidationError(str(error))
-        finally:
-            conn.disconnect()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('Cleared %(cleared)s records from the device and '
+                             'purged %(purged)s punches from Odoo',
+                             cleared=cleared, purged=purged),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def _clear_device_log(self):
+        """Clear the attendance log stored on the device.
+
+        The device is disabled while its log size is compared with the
+        import watermark, so no punch can be recorded between the check
+        and the clear. The log is only cleared when every record on the
+        device has been imported. While users of the device are queued
+        for review their punches were skipped rather than imported, the
+        log is then only cleared when the raw logs retain all of it, see
+        :meth:`_raw_logs_cover`.
+
+        The sync lock of the device is held from the check to the clear,
+        so no download can move the watermark meanwhile, and the
+        watermark is read in a new transaction once the lock is taken:
+        the snapshot of the current one may predate the last download.
+
+        :return: number of records cleared from the device
+        """
+        self.ensure_one()
+        with self._sync_lock():
+            self.env.cr.commit()
+            self.invalidate_recordset(['last_record_count', 'last_clear_date'])
+            with self._connect() as conn:
+                conn.disable_device()
+                try:
+                    conn.read_sizes()
+                    records = conn.records
+                    if not records:
+                        raise UserError(_('No attendance records found to clear.'))
+                    if records > self.last_record_count:
+                        raise UserError(_(
+                            "The device holds %(pending)s records that are not "
+                            "imported yet. Download the attendance before "
+                            "clearing the device.",
+                            pending=records - self.last_record_count))
+                    if self.env['zk.unmapped.user'].sudo().search_count([
+                        ('device_id', '=', self.id), ('state', '=', 'pending'),
+                    ]) and not self._raw_logs_cover(records):
+                        raise UserError(_(
+                            "Users of this device are queued for review and "
+                            "their punches are not imported yet. Map or ignore "
+                            "them, or keep the raw logs of the device, before "
+                            "clearing it."))
+                    conn.clear_attendance()
+                finally:
+                    conn.enable_device()
+            self._update_watermark(0, False)
+            self.sudo().last_clear_date = fields.Datetime.now()
+            self.env.cr.commit()
+        return records
+
+    def _raw_logs_cover(self, records):
+        """Tell whether the raw logs stored since the last clear hold the
+        whole device log
+
+        :param records: current size of the device log
+        :return: True when positions ``0`` to ``records`` are retained
+        """
+        self.ensure_one()
+        domain = [('device_id', '=', self.id)]
+        if self.last_clear_date:
+            domain.append(('create_date', '>=', self.last_clear_date))
+        needed = records
+        for raw_log in self.env['biometric.device.raw.log'].sudo().search_fetch(
+                domain, ['log_start', 'record_count'], order='id desc'):
+            if not needed:
+                break
+            if raw_log.log_start + raw_log.record_count < needed:
+                return False
+            needed = min(needed, raw_log.log_start)
+        return not needed
+
+    def _purge_attendance(self, commit=False):
+        """Delete the punches of the device older than ``retention_days``.
+
+        Only punches already paired into hr.attendance are removed, in
+        batches, see :meth:`zk.machine.attendance._purge_punches`.
+
+        :param commit: commit the transaction after every batch
+        :return: number of purged punches
+        """
+        self.ensure_one()
+        if self.retention_days <= 0:
+            return 0
+        cutoff = fields.Datetime.now() - timedelta(days=self.retention_days)
+        deleted = self.env['zk.machine.attendance'].sudo()._purge_punches(
+            "device_id = %(device_id)s AND punching_time < %(cutoff)s "
+            "AND is_paired", {'device_id': self.id, 'cutoff': cutoff},
+            commit=commit)
+        _logger.info("Purged %s punches of device %s older than %s",
+                     deleted, self.name, cutoff)
+        return deleted
+
+    @api.model
+    def cron_purge_attendance(self):
+        """Cron job purging the punches past the retention of each device"""
+        for device in self.search([('retention_days', '>', 0)]):
+            device._purge_attendance(commit=True)
 
     @api.model
     def cron_download(self):
-        """Cron job to download attendance from all devices"""
-        devices = self.search([('active', '=', True)])
-        for device in devices:
+        """Cron job to download attendance from all devices.
+
+        Several crons calling this method, on as many workers or servers,
+        share the devices: each run repeatedly claims a shard of up to
+        ``hr_zk_attendance.sync_workers`` devices not synced since it
+        started, stalest first, by taking their advisory lock (see
+        :meth:`_try_sync_lock`). Devices locked by another run or by a
+        manual download are skipped. The logs of a shard are fetched
+        concurrently by a pool of threads while the fetched logs are
+        imported one device at a time in the cron cursor as soon as they
+        arrive, and each lock is released once its device is stored.
+        """
+        run_start = fields.Datetime.now()
+        workers = max(1, int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_zk_attendance.sync_workers', DEFAULT_SYNC_WORKERS)))
+        while True:
+            shard = self._claim_sync_shard(run_start, workers)
+            if not shard:
+                return
             try:
-                device.action_download_attendance()
-            except Exception as e:
-                _logger.error("Error downloading attendance from device %s: %s", device.name, str(e))
+                with ThreadPoolExecutor(max_workers=len(shard),
+                                        thread_name_prefix='zk_sync') as executor:
+                    futures = {
+                        executor.submit(fetch_device_logs, device._get_sync_params()): device
+                        for device in shard
+                    }
+                    for future in as_completed(futures):
+                        device = futures[future]
+                        try:
+                            device._store_sync_result(future.result())
+                        finally:
+                            device._release_sync_lock()
+                            shard -= device
+            finally:
+                for device in shard:
+                    device._release_sync_lock()
 
-    def action_download_attendance(self):
-        """Function to download attendance records from the device"""
+    @api.model
+    def _claim_sync_shard(self, run_start, size):
+        """Lock up to ``size`` devices due for a scheduled download
+
+        :param run_start: start of the cron run, devices synced since then
+            have been handled by another run
+        :param size: maximum number of devices to claim
+        :return: the claimed devices, empty when none is left
+        """
+        candidates = self.search([
+            ('active', '=', True),
+            '|', ('last_sync_date', '=', False),
+            ('last_sync_date', '<', run_start),
+        ], order='last_sync_date asc nulls first, id')._filter_circuit_ready()
+        shard = self.browse()
+        for device in candidates:
+            if len(shard) >= size:
+                break
+            if device._try_sync_lock():
+                # another run may have stored it between the search and the
+                # lock: end the snapshot of the search before reading again,
+                # repeatable read would hide that commit
+                self.env.cr.commit()
+                device.invalidate_recordset(['last_sync_date'])
+                if device.last_sync_date and device.last_sync_date >= run_start:
+                    device._release_sync_lock()
+                    continue
+                shard |= device
+        return shard
+
+    def _try_sync_lock(self):
+        """Take the session-level advisory lock of the device without
+        waiting; it survives the commits of the import and must be
+        released with :meth:`_release_sync_lock`
+
+        :return: whether the lock was obtained
+        """
+        self.ensure_one()
+        self.env.cr.execute("SELECT pg_try_advisory_lock(%s, %s)",
+                            (SYNC_LOCK_NAMESPACE, self.id))
+        return self.env.cr.fetchone()[0]
+
+    def _release_sync_lock(self):
+        """Release the advisory lock taken by :meth:`_try_sync_lock`.
+
+        The lock belongs to the database session, not to the transaction:
+        when the transaction has been aborted by an error it is rolled
+        back first, otherwise the unlock would fail and the lock would
+        stay on the pooled connection.
+        """
         self.ensure_one()
-        _logger.info("Starting attendance download from device: %s", self.name)
-        
         try:
-            zk = ZK(self.device_ip, port=self.port_number, timeout=15,
-                    password=0, force_udp=False, ommit_ping=False)
-        except NameError:
-            raise UserError(_("Pyzk module not Found. Please install it with 'pip3 install pyzk'."))
-        
-        conn = self.device_connect(zk)
-        if not conn:
-            raise UserError(_("Unable to connect to the device."))
-        
+            self.env.cr.execute("SELECT pg_advisory_unlock(%s, %s)",
+                                (SYNC_LOCK_NAMESPACE, self.id))
+        except InFailedSqlTransaction:
+            self.env.cr.rollback()
+            self.env.cr.execute("SELECT pg_advisory_unlock(%s, %s)",
+                                (SYNC_LOCK_NAMESPACE, self.id))
+
+    @contextlib.contextmanager
+    def _sync_lock(self):
+        """Context manager holding the advisory lock of the device, for
+        downloads started outside of :meth:`cron_download`"""
+        self.ensure_one()
+        if not self._try_sync_lock():
+            raise UserError(_(
+                "Device %s is being synchronized by another process, try "
+                "again in a moment.", self.name))
         try:
-            conn.disable_device()
-            users = conn.get_users()
-            attendance = conn.get_attendance()
-            
-            if not attendance:
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'message': _('No new attendance records found'),
-                        'type': 'info',
-                        'sticky': False,
-                    }
-                }
-            
-            user_dict = {user.user_id: user for user in users}
-            ZkAttendance = self.env['zk.machine.attendance'].sudo()
-            
-            attendance_vals = []
-            for record in attendance:
-                user_id = record.user_id
-                if user_id not in user_dict:
-                    continue
-                
-                # Convert to UTC
-                local_tz = pytz.timezone(self.env.user.tz or 'UTC')
-                local_dt = local_tz.localize(record.timestamp, is_dst=None)
-                utc_dt = local_dt.astimezone(pytz.utc)
-                atten_time = fields.Datetime.to_string(utc_dt)
-                
-                employee = self.env['hr.employee'].sudo().search([
-                    ('device_id_num', '=', user_id)
-                ], limit=1)
-                
-                if not employee:
-                    employee = self.env['hr.employee'].sudo().create({
-                        'name': user_dict[user_id].name,
-                        'device_id_num': user_id,
-                    })
-                
-                # Check for duplicate
-                if not ZkAttendance.search_count([
-                    ('device_id_num', '=', user_id),
-                    ('punching_time', '=', atten_time)
-                ]):
-                    attendance_vals.append({
-                        'employee_id': employee.id,
-                        'device_id_num': user_id,
-                        'punching_time': atten_time,
-                        'attendance_type': str(record.status),
-                        'punch_type': str(getattr(record, 'punch', '0')),
-                        'address_id': self.address_id.id,
-                        'company_id': employee.company_id.id or self.env.company.id,
-                    })
-            
-            if attendance_vals:
-                ZkAttendance.create(attendance_vals)
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'message': _('Successfully downloaded %s attendance records', len(attendance_vals)),
-                        'type': 'success',
-                        'sticky': False,
-                    }
-                }
-            else:
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'message': _('No new attendance records to import'),
-                        'type': 'info',
-                        'sticky': False,
-                    }
-                }
-        
-        except Exception as e:
-            raise UserError(_("Error downloading attendance: %s", str(e)))
+            yield
         finally:
+            self._release_sync_lock()
+
+    def _get_sync_params(self):
+        """Return the plain values needed by :func:`fetch_device_logs`"""
+        self.ensure_one()
+        return {
+            'name': self.name,
+            'key': self._get_session_key(),
+            'settings': self._get_connection_settings(),
+            'ttl': self.session_ttl,
+            'retries': max(self.sync_retries, 0),
+            'retry_delay': max(self.sync_retry_delay, 0.0),
+            'users_key': self._get_user_snapshot_key(),
+            'snapshot': [SnapshotUser(*user) for user in json.loads(
+                self.user_snapshot or '[]')],
+            'start': self.last_record_count,
+            'last_record_time': self.last_punch_time,
+            'tz': self._get_device_tz(),
+            'dst_policy': self.dst_policy,
+            'probe_timeout': float(self.env['ir.config_parameter'].sudo().get_param(
+                'hr_zk_attendance.probe_timeout', DEFAULT_PROBE_TIMEOUT)),
+        }
+
+    def _get_user_snapshot_key(self):
+        """Key of the stored user list snapshot, None when there is none
+        or when it is older than ``hr_zk_attendance.user_snapshot_hours``"""
+        self.ensure_one()
+        if not self.user_snapshot_key or not self.user_snapshot_date:
+            return None
+        hours = float(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_zk_attendance.user_snapshot_hours', DEFAULT_USER_SNAPSHOT_HOURS))
+        if self.user_snapshot_date < fields.Datetime.now() - timedelta(hours=hours):
+            return None
+        return self.user_snapshot_key
+
+    def _resolve_sync_users(self, result):
+        """Return the users of a fetched device log, from the snapshot
+        when the device did not send them, else storing them as the new
+        snapshot
+
+        :param result: dict returned by :func:`fetch_device_logs`
+        :return: list of pyzk ``User`` or :class:`SnapshotUser` records
+        """
+        self.ensure_one()
+        if result['users'] is None:
+            return [SnapshotUser(*user) for user in json.loads(self.user_snapshot or '[]')]
+        self.sudo().write({
+            'user_snapshot': json.dumps([[user.uid, user.user_id, user.name]
+                                         for user in result['users']]),
+            'user_snapshot_key': result['users_key'],
+            'user_snapshot_date': fields.Datetime.now(),
+        })
+        return result['users']
+
+    def action_reset_user_snapshot(self):
+        """Read the user list of the devices again at the next download"""
+        self.sudo().write({'user_snapshot': False, 'user_snapshot_key': False,
+                           'user_snapshot_date': False})
+
+    def _filter_circuit_ready(self):
+        """Return the devices the scheduled jobs may contact: online
+        devices and paused devices due for a retry"""
+        now = fields.Datetime.now()
+        return self.filtered(lambda device: device.circuit_state == 'closed'
+                             or not device.circuit_retry_at
+                             or device.circuit_retry_at <= now)
+
+    def _record_sync_failure(self, reason):
+        """Count a failed download and pause the device once the failures
+        reach ``circuit_threshold``; every further failure doubles the
+        pause"""
+        self.ensure_one()
+        failures = self.failure_count + 1
+        vals = {'failure_count': failures, 'last_failure_reason': reason}
+        if failures >= max(self.circuit_threshold, 1):
+            delay = min(CIRCUIT_BASE_DELAY * 2 ** (failures - max(self.circuit_threshold, 1)),
+                        CIRCUIT_MAX_DELAY)
+            vals.update(circuit_state='open',
+                        circuit_retry_at=fields.Datetime.now() + timedelta(seconds=delay))
+        self.sudo().write(vals)
+
+    def _record_sync_success(self):
+        """Close the circuit of a device that answered again"""
+        self.ensure_one()
+        if self.failure_count or self.circuit_state != 'closed':
+            self.sudo().write({'failure_count': 0, 'circuit_state': 'closed',
+                               'circuit_retry_at': False})
+
+    def action_reset_circuit(self):
+        """Resume the scheduled jobs on paused devices right away"""
+        self.sudo().write({'failure_count': 0, 'circuit_state': 'closed',
+                           'circuit_retry_at': False})
+
+    def _download_device_logs(self, trigger='cron', progress=None):
+        """Fetch and import the device log in the current thread
+
+        :param trigger: origin of the download, see :meth:`_create_sync_log`
+        :param progress: optional callback, see :meth:`_process_download`
+        """
+        self.ensure_one()
+        with self._sync_lock():
+            self._store_sync_result(fetch_device_logs(self._get_sync_params()),
+                                    trigger=trigger, progress=progress)
+
+    def _store_sync_result(self, result, trigger='cron', progress=None):
+        """Import a fetched device log and record the outcome on the device.
+
+        Batches are committed as they are imported, so a failure keeps
+        the batches imported before it and does not affect other devices.
+
+        :param result: dict returned by :func:`fetch_device_logs`
+        :param trigger: origin of the download, see :meth:`_create_sync_log`
+        :param progress: optional callback, see :meth:`_process_download`
+        """
+        self.ensure_one()
+        vals = {'last_sync_date': fields.Datetime.now()}
+        stats = {}
+        if 'error' in result:
+            _logger.error("Error downloading attendance from device %s: %s",
+                          self.name, result['error'])
+            vals.update(last_sync_state='failed', last_sync_message=_(
+                "%(error)s (%(attempts)s attempts)",
+                error=result['error'], attempts=result['attempts']))
+            self._record_sync_failure(result['error'])
+        else:
             try:
-                conn.enable_device()
-                conn.disconnect()
-            except Exception:
-                pass
+                stats = self._process_download(self._resolve_sync_users(result),
+                                               result['log'], commit=True,
+                                               progress=progress)
+                self._record_sync_success()
+                vals.update(last_sync_state='success', last_sync_message=_(
+                    "%(imported)s imported, %(skipped)s skipped in "
+                    "%(fetch)ss fetch + %(elapsed)ss import",
+                    imported=stats['imported'], skipped=stats['skipped'],
+                    fetch=result['fetch_time'], elapsed=stats['elapsed']))
+            except Exception as e:
+                self.env.cr.rollback()
+                # employees provisioned by the failed import are gone, the
+                # cached device id mapping may still hold them
+                self.env.registry.clear_cache()
+                _logger.error("Error importing attendance from device %s: %s",
+                              self.name, str(e))
+                result = dict(result, error=str(e))
+                vals.update(last_sync_state='failed', last_sync_message=str(e))
+        self.sudo().write(vals)
+        self._create_sync_log(trigger, result, stats)
+        self.env.cr.commit()
 
-    def action_restart_device(self):
-        """Function to restart the device"""
+    def _create_sync_log(self, trigger, result, stats, new_cursor=False):
+        """Record a download in biometric.device.sync.log
+
+        :param trigger: ``'cron'``, ``'manual'`` or ``'file'``
+        :param result: dict returned by :func:`fetch_device_logs`, with
+            the import error if any
+        :param stats: dict returned by :meth:`_process_download`, empty
+            when nothing was imported
+        :param new_cursor: write the log in its own transaction, for
+            failures whose transaction is about to be rolled back
+        """
         self.ensure_one()
-        try:
-            zk = ZK(self.device_ip, port=self.port_number, timeout=30,
-                    password=0, force_udp=False, ommit_ping=False)
-        except NameError:
-            raise UserError(_("Please install pyzk with 'pip3 install pyzk'."))
-        
-        conn = self.device_connect(zk)
-        if not conn:
-            raise UserError(_('Unable to connect to the device.'))
+        vals = {
+            'device_id': self.id,
+            'trigger': trigger,
+            'state': 'failed' if result.get('error') else 'success',
+            'error': result.get('error'),
+            'attempts': result.get('attempts', 0),
+            'connect_time': result.get('connect_time', 0.0),
+            'fetch_time': result.get('fetch_time', 0.0),
+            'import_time': stats.get('elapsed', 0.0),
+            'records_received': stats.get('processed', 0),
+            'records_imported': stats.get('imported', 0),
+            'records_skipped': stats.get('skipped', 0),
+            'records_unknown': stats.get('unknown', 0),
+            'queries': stats.get('queries', 0),
+            'log_size': stats.get('log_size', 0),
+            'watermark_start': stats.get('watermark_start', 0),
+            'watermark_end': stats.get('watermark_end', 0),
+        }
+        if new_cursor:
+            with self.env.registry.cursor() as cr:
+                self.env(cr=cr, su=True)['biometric.device.sync.log'].create(vals)
+        else:
+            self.env['biometric.device.sync.log'].sudo().create(vals)
+
+    def action_download_attendance(self):
+        """Function to download attendance records from the device"""
+        self.ensure_one()
+        _logger.info("Starting attendance download from device: %s", self.name)
+        if zk_pool.ZK is None:
+            raise UserError(_("Pyzk module not Found. Please install it with 'pip3 install pyzk'."))
+        with self._sync_lock():
+            result = fetch_device_logs(dict(self._get_sync_params(), retries=0))
+            try:
+                if 'error' in result:
+                    raise UserError(result['error'])
+                stats = self._process_download(self._resolve_sync_users(result),
+                                               result['log'])
+            except Exception as e:
+                self._create_sync_log('manual', dict(result, error=str(e)), {},
+                                      new_cursor=True)
+                raise UserError(_("Error downloading attendance: %s", str(e)))
+        self._create_sync_log('manual', result, stats)
         
-        try:
-            conn.restart()
+        if not stats['processed']:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'message': _('No new attendance records found'),
+                    'type': 'info',
+                    'sticky': False,
+                }
+            }
+        if stats['imported']:
             return {
                 'type': 'ir.actions.client',
                 'tag': 'display_notification',
                 'params': {
-                    'message': _('Device restart initiated successfully'),
+                    'message': _('Successfully downloaded %(count)s attendance records (%(rate)s rows/s)',
+                                 count=stats['imported'], rate=stats['rate']),
                     'type': 'success',
                     'sticky': False,
                 }
             }
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('No new attendance records to import'),
+                'type': 'info',
+                'sticky': False,
+            }
+        }
+
+    def _process_download(self, users, log, commit=False, progress=None):
+        """Import the records of a fetched device log past the watermark.
+
+        The raw log is decoded and imported ``import_batch_size`` records
+        at a time and the watermark follows each batch, so the memory used
+        does not grow with the size of the log. When the device log is
+        shorter than at the last import, or its record before the
+        watermark no longer has the time stored in ``last_punch_time``,
+        it has been cleared or rotated and the whole log is imported
+        again. The records past the
+        watermark are first kept in biometric.device.raw.log when
+        ``keep_raw_logs`` is set, committed before the import starts so
+        that they survive an import failing in its first batch. When
+        ``commit`` is not set they are written under a savepoint of the
+        current transaction, which may hold the uncommitted device.
+
+        :param users: list of pyzk ``User`` records enrolled on the device
+        :param log: tuple of raw log bytes and record size, as returned by
+            :func:`read_attendance_buffer`
+        :param commit: commit the transaction after every batch
+        :param progress: optional callable receiving the number of records
+            processed and to process after every batch, before the commit
+        :return: dict of import statistics summed over the batches, see
+            :meth:`_import_attendance`
+        """
+        self.ensure_one()
+        data, record_size = log
+        total = count_records(data, record_size)
+        tz_name = self._get_device_tz()
+        if is_log_replaced(data, record_size, self.last_record_count,
+                           self.last_punch_time, tz_name, self.dst_policy):
+            _logger.info("Device %s log was cleared since the import of %s "
+                         "records, it holds %s, running a full resync",
+                         self.name, self.last_record_count, total)
+            self._update_watermark(0, False)
+        self._provision_device_users(users)
+        position = start = self.last_record_count
+        if self.keep_raw_logs:
+            if commit:
+                self.env['biometric.device.raw.log'].sudo()._store(
+                    self, data, record_size, position, users)
+                self.env.cr.commit()
+            else:
+                with self.env.cr.savepoint():
+                    self.env['biometric.device.raw.log'].sudo()._store(
+                        self, data, record_size, position, users)
+        stats = {'processed': 0, 'imported': 0, 'skipped': 0, 'unknown': 0,
+                 'last_punch_time': self.last_punch_time, 'queries': 0,
+                 'elapsed': 0.0, 'log_size': total, 'watermark_start': position}
+        for batch in iter_attendance_batches(
+                data, record_size, users,
+                self.import_batch_size or DEFAULT_IMPORT_BATCH_SIZE, position):
+            batch_stats = self._import_attendance(batch, users)
+            position += len(batch)
+            self._update_watermark(position, to_utc(
+                [batch[-1].timestamp], tz_name, self.dst_policy)[0])
+            if progress:
+                progress(position - start, total - start)
+            if commit:
+                self.env.cr.commit()
+            for key in ('processed', 'imported', 'skipped', 'unknown',
+                        'queries', 'elapsed'):
+                stats[key] += batch_stats[key]
+            stats['last_punch_time'] = self.last_punch_time
+        stats['watermark_end'] = position
+        stats['elapsed'] = round(stats['elapsed'], 3)
+        stats['rate'] = int(stats['processed'] / stats['elapsed']) if stats['elapsed'] else stats['processed']
+        if stats['imported']:
+            self._trigger_pairing()
+        return stats
+
+    def _import_file(self, stream, file_format='auto', commit=False):
+        """Import an attendance file exported from the device.
+
+        The file is parsed as a stream and imported ``import_batch_size``
+        records at a time through :meth:`_import_attendance`, with the
+        same employee mapping, timezone conversion and dedup as network
+        downloads. The watermark of the device is left alone.
+
+        :param stream: binary file object
+        :param file_format: ``attlog``, ``csv`` or ``auto``
+        :param commit: commit the transaction after every batch
+        :return: dict of import statistics summed over the batches, plus
+            the number of ``invalid`` lines
+        """
+        self.ensure_one()
+        start_time = time.perf_counter()
+        parse_stats = ParseStats()
+        stats = {'processed': 0, 'imported': 0, 'skipped': 0, 'unknown': 0,
+                 'duplicates': 0, 'queries': 0}
+        batch_size = self.import_batch_size or DEFAULT_IMPORT_BATCH_SIZE
+        batch = []
+        for record in iter_file_records(stream, file_format, parse_stats):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self._import_file_batch(batch, stats, commit)
+                batch = []
+        if batch:
+            self._import_file_batch(batch, stats, commit)
+        stats['invalid'] = parse_stats.invalid
+        stats['elapsed'] = round(time.perf_counter() - start_time, 3)
+        stats['rate'] = int(parse_stats.lines / stats['elapsed']) if stats['elapsed'] else parse_stats.lines
+        if stats['imported']:
+            self._trigger_pairing()
+        _logger.info("Imported attendance file for device %s: %s",
+                     self.name, stats)
+        return stats
+
+    def _import_file_batch(self, batch, stats, commit):
+        """Import one batch of :meth:`_import_file` and sum its stats
+
+        The PINs of the batch without an employee are provisioned first
+        under ``unknown_user_policy``, as for pushed punches: files carry
+        no user list, the PIN stands for the name of created employees.
+        """
+        employee_map = self.env['hr.employee']._get_device_employee_map()
+        unknown = {record.user_id for record in batch
+                   if record.user_id not in employee_map}
+        if unknown:
+            self._provision_device_users([
+                SnapshotUser(0, pin, pin) for pin in unknown])
+        batch_stats = self._import_attendance(batch)
+        for key in ('processed', 'imported', 'skipped', 'unknown',
+                    'duplicates', 'queries'):
+            stats[key] += batch_stats.get(key, 0)
+        if commit:
+            self.env.cr.commit()
+
+    def import_attendance_file(self, path, file_format='auto'):
+        """Import an exported attendance file stored on the server, e.g.
+        from a shell or a scheduled action, committing every batch
+
+        :param path: path of the file on the server
+        :param file_format: ``attlog``, ``csv`` or ``auto``
+        :return: dict of import statistics, see :meth:`_import_file`
+        """
+        self.ensure_one()
+        with open(path, 'rb') as stream:
+            stats = self._import_file(stream, file_format, commit=True)
+        self._create_sync_log('file', {}, stats)
+        self.env.cr.commit()
+        return stats
+
+    def _trigger_pairing(self):
+        """Schedule the pairing of the new punches into hr.attendance"""
+        cron = self.env.ref('hr_zk_attendance.ir_cron_pair_punches',
+                            raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    def _provision_device_users(self, users):
+        """Map the enrolled users of the device without an employee.
+
+        Depending on ``unknown_user_policy`` the missing employees are
+        created in one batch, or the users are queued in
+        zk.unmapped.user for review; their punches are skipped until they
+        are mapped.
+
+        :param users: list of pyzk ``User`` records enrolled on the device
+        :return: number of users created or queued
+        """
+        self.ensure_one()
+        employee_map = self.env['hr.employee']._get_device_employee_map()
+        missing = {user.user_id: user for user in users
+                   if user.user_id and user.user_id not in employee_map}
+        if not missing:
+            return 0
+        if self.unknown_user_policy == 'queue':
+            return self.env['zk.unmapped.user'].sudo()._queue_users(
+                self, missing.values())
+        self.env['hr.employee'].sudo().create([{
+            'name': user.name,
+            'device_id_num': user_id,
+            'company_id': self.company_id.id or self.env.company.id,
+        } for user_id, user in missing.items()])
+        _logger.info("Created %s employees for the users of device %s",
+                     len(missing), self.name)
+        return len(missing)
+
+    @api.model
+    def cron_check_clocks(self):
+        """Cron job reading the clock of every active device concurrently,
+        correcting the devices drifting beyond their tolerance"""
+        self.search([('active', '=', True)])._filter_circuit_ready().action_check_clocks()
+
+    def action_check_clocks(self):
+        """Measure the clock drift of the devices, in parallel, and keep
+        the history in biometric.device.clock.log"""
+        devices = self.filtered('active')
+        if not devices or zk_pool.ZK is None:
+            return
+        workers = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_zk_attendance.sync_workers', DEFAULT_SYNC_WORKERS))
+        workers = max(1, min(workers, len(devices)))
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix='zk_clock') as executor:
+            futures = {
+                executor.submit(check_device_clock, device._get_sync_params(),
+                                device._get_device_tz(), device.dst_policy,
+                                device.max_clock_drift,
+                                device.auto_correct_clock): device
+                for device in devices
+            }
+            results = {futures[future]: future.result()
+                       for future in as_completed(futures)}
+        self.env['biometric.device.clock.log'].sudo().create([
+            dict(result, device_id=device.id)
+            for device, result in results.items()
+        ])
+        for device, result in results.items():
+            if 'error' not in result:
+                device.sudo().write({'clock_drift': result['drift'],
+                                     'clock_checked_date': fields.Datetime.now()})
+                if result['exceeded']:
+                    _logger.warning("Device %s clock drifts by %ss%s",
+                                    device.name, result['drift'],
+                                    " (corrected)" if result['corrected'] else "")
+
+    def _get_push_users(self):
+        """Compute the users expected on the device
+
+        Active employees with a biometric device id of the company of the
+        device (of every company for a device without company) must be
+        enrolled. Users of archived employees are removed; users unknown
+        to Odoo, such as device administrators, are left untouched.
+
+        :return: tuple of the dict of user id to ``(name, card)`` and the
+            set of user ids to remove
+        """
+        self.ensure_one()
+        domain = [('device_id_num', '!=', False)]
+        if self.company_id:
+            domain.append(('company_id', 'in', (self.company_id.id, False)))
+        employees = self.env['hr.employee'].sudo().with_context(
+            active_test=False).search_fetch(
+            domain, ['name', 'device_id_num', 'device_card', 'active'])
+        wanted = {employee.device_id_num: (employee.name, employee.device_card or 0)
+                  for employee in employees if employee.active}
+        removable = {employee.device_id_num for employee in employees
+                     if not employee.active} - set(wanted)
+        return wanted, removable
+
+    def action_push_employees(self):
+        """Enroll the employees on the selected devices, in parallel
+
+        Only the differences are applied, see :func:`push_device_users`,
+        and the outcome is stored and reported per device.
+        """
+        devices = self.filtered('active')
+        if not devices:
+            raise UserError(_('Select at least one active device.'))
+        if zk_pool.ZK is None:
+            raise UserError(_("Pyzk module not Found. Please install it with 'pip3 install pyzk'."))
+        workers = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_zk_attendance.sync_workers', DEFAULT_SYNC_WORKERS))
+        workers = max(1, min(workers, len(devices)))
+        jobs = {device: (device._get_sync_params(),) + device._get_push_users()
+                for device in devices}
+        lines = []
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix='zk_push') as executor:
+            futures = {executor.submit(push_device_users, *args): device
+                       for device, args in jobs.items()}
+            for future in as_completed(futures):
+                device, result = futures[future], future.result()
+                if 'error' in result:
+                    message = result['error']
+                else:
+                    message = _(
+                        "%(added)s added, %(updated)s updated, %(removed)s "
+                        "removed, %(unchanged)s unchanged, %(failed)s failed "
+                        "in %(time)ss",
+                        added=result['added'], updated=result['updated'],
+                        removed=result['removed'],
+                        unchanged=result['unchanged'],
+                        failed=len(result['failures']),
+                        time=result['total_time'])
+                for user_id, error in result['failures']:
+                    _logger.warning("Could not push user %s to device %s: %s",
+                                    user_id, device.name, error)
+                device.sudo().write({'last_push_date': fields.Datetime.now(),
+                                     'last_push_message': message})
+                if result['added'] or result['updated'] or result['removed']:
+                    device.action_reset_user_snapshot()
+                lines.append("%s: %s" % (device.name, message))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Employees pushed to %s devices', len(devices)),
+                'message': '\n'.join(sorted(lines)),
+                'type': 'info',
+                'sticky': True,
+            }
+        }
+
+    def _update_watermark(self, record_count, last_punch_time):
+        """Persist the import watermark of the device
+
+        :param record_count: size of the device log covered by the import
+        :param last_punch_time: UTC datetime of the last record covered,
+            see :func:`is_log_replaced`
+        """
+        self.ensure_one()
+        self.sudo().write({'last_record_count': record_count,
+                           'last_punch_time': last_punch_time if record_count else False})
+
+    def action_reset_watermark(self):
+        """Forget the import watermark so the next download resyncs the
+        whole device log"""
+        for device in self:
+            device._update_watermark(0, False)
+
+    def _import_attendance(self, attendance, users=None):
+        """Bulk import device punches into zk.machine.attendance.
+
+        Employees are resolved through the cached ``device_id_num``
+        mapping of :meth:`hr.employee._get_device_employee_map`, so users
+        must have been provisioned beforehand (see
+        :meth:`_provision_device_users`). Punches are written
+        ``IMPORT_CHUNK_SIZE`` at a time with duplicates against the
+        ``(device_id_num, punching_time)`` key dropped by the database.
+        Timestamps are converted from the device timezone to UTC for the
+        whole batch at once, see :func:`..tools.zk_tz.to_utc`. Punches
+        older than the last archival are skipped, they are already stored
+        in zk.attendance.archive. Punches recorded while the device clock
+        was off are flagged, see
+        :meth:`biometric.device.clock.log._get_suspect_checker`. Repeated badging of an employee across
+        devices is collapsed by
+        :meth:`zk.machine.attendance._collapse_duplicates`.
+
+        :param attendance: iterable of pyzk ``Attendance`` records
+        :param users: list of pyzk ``User`` records enrolled on the device,
+            punches of other users are skipped; None when the user list is
+            not known, e.g. for pushed punches
+        :return: dict with the processed, imported, skipped, unknown and
+            duplicates record counts, the latest punch time, the number of queries
+            issued, the elapsed time and the throughput in rows per second
+        """
+        self.ensure_one()
+        cr = self.env.cr
+        start_time = time.perf_counter()
+        start_queries = cr.sql_log_count
+        ZkAttendance = self.env['zk.machine.attendance'].sudo()
+        user_ids = {user.user_id for user in users} if users is not None else None
+        employee_map = self.env['hr.employee']._get_device_employee_map()
+        archived_until = self.env['zk.attendance.archive']._get_archived_until()
+        stats = {'processed': 0, 'imported': 0, 'skipped': 0, 'unknown': 0,
+                 'last_punch_time': False}
+        seen = set()
+        vals_list = []
+        attendance = list(attendance)
+        known = [record for record in attendance
+                 if (user_ids is None or record.user_id in user_ids)
+                 and record.user_id in employee_map]
+        punch_times = to_utc([record.timestamp for record in known],
+                             self._get_device_tz(), self.dst_policy)
+        stats['processed'] = len(attendance)
+        stats['unknown'] = len(attendance) - len(known)
+        is_suspect = self.env['biometric.device.clock.log'].sudo()._get_suspect_checker(
+            self, min(punch_times)) if punch_times else None
+        for record, atten_time in zip(known, punch_times):
+            user_id = record.user_id
+            if not stats['last_punch_time'] or atten_time > stats['last_punch_time']:
+                stats['last_punch_time'] = atten_time
+            if (user_id, atten_time) in seen or \
+                    (archived_until and atten_time < archived_until):
+                continue
+            seen.add((user_id, atten_time))
+            employee_id, company_id = employee_map[user_id]
+            vals_list.append({
+                'employee_id': employee_id,
+                'company_id': company_id or self.env.company.id,
+                'device_id_num': user_id,
+                'punching_time': atten_time,
+                'attendance_type': str(record.status),
+                'punch_type': str(getattr(record, 'punch', '0')),
+                'device_id': self.id,
+                'address_id': self.address_id.id,
+                'clock_suspect': is_suspect(atten_time),
+            })
+        vals_list, stats['duplicates'] = ZkAttendance._collapse_duplicates(vals_list)
+        for index in range(0, len(vals_list), IMPORT_CHUNK_SIZE):
+            stats['imported'] += len(ZkAttendance._insert_punches(
+                vals_list[index:index + IMPORT_CHUNK_SIZE]))
+
+        stats['skipped'] = stats['processed'] - stats['imported'] - stats['unknown']
+        stats['queries'] = cr.sql_log_count - start_queries
+        stats['elapsed'] = round(time.perf_counter() - start_time, 3)
+        stats['rate'] = int(stats['processed'] / stats['elapsed']) if stats['elapsed'] else stats['processed']
+        _logger.info("Imported attendance from device %s: %s", self.name, stats)
+        return stats
+
+    def action_restart_device(self):
+        """Function to restart the device"""
+        self.ensure_one()
+        try:
+            with self._connect() as conn:
+                conn.restart()
         except Exception as error:
             raise ValidationError(str(error))
         finally:
-            try:
-                conn.disconnect()
-            except Exception:
-                pass
+            # the restart drops the session on the device side, do not
+            # hand it out again until the health check notices
+            zk_pool.POOL.discard(self._get_session_key())
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('Device restart initiated successfully'),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import io
+import logging
+import time
+from datetime import timedelta
+import psycopg2
+from odoo import api, fields, models, tools, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Seconds a run of the job runner keeps claiming jobs before handing over
+# to a new run
+JOB_RUNNER_TIME_BUDGET = 240
+# Hours after which a job still marked running is considered interrupted
+STALE_JOB_HOURS = 2
+# Operations that may be queued several times for the same device
+REPEATABLE_JOB_TYPES = ('file_import',)
+
+
+class BiometricDeviceJob(models.Model):
+    """Device operations queued from the interface and run in the
+    background by the job runner cron"""
+    _name = 'biometric.device.job'
+    _description = 'Biometric Device Job'
+    _order = 'id desc'
+
+    device_id = fields.Many2one('biometric.device.details', string='Device',
+                                required=True, ondelete='cascade', index=True,
+                                help='Device the job runs against')
+    company_id = fields.Many2one(related='device_id.company_id', store=True,
+                                 string='Company')
+    job_type = fields.Selection([('download', 'Download Attendance'),
+                                 ('clear', 'Clear Attendance'),
+                                 ('restart', 'Restart Device'),
+                                 ('file_import', 'Import Attendance File')],
+                                string='Operation', required=True)
+    state = fields.Selection([('pending', 'Pending'), ('running', 'Running'),
+                              ('done', 'Done'), ('failed', 'Failed')],
+                             string='Status', default='pending',
+                             required=True, index=True)
+    progress = fields.Float(string='Progress', aggregator=None,
+                            help='Share of the work done, in percent')
+    message = fields.Text(string='Result', help='Outcome of the job')
+    user_id = fields.Many2one('res.users', string='Requested By',
+                              default=lambda self: self.env.user,
+                              help='User who queued the job; the device '
+                                   'timezone falls back to theirs')
+    date_started = fields.Datetime(string='Started', readonly=True)
+    date_finished = fields.Datetime(string='Finished', readonly=True)
+    file = fields.Binary(string='File', attachment=True,
+                         help='Attendance file to import, removed once '
+                              'imported')
+    filename = fields.Char(string='File Name')
+    file_format = fields.Selection(
+        [('auto', 'Detect'), ('attlog', 'attlog.dat'), ('csv', 'CSV')],
+        string='File Format', default='auto')
+
+    def init(self):
+        """At most one pending or running job per device and operation,
+        file imports aside"""
+        if not tools.index_exists(self.env.cr, 'biometric_device_job_active_unique'):
+            tools.drop_index(self.env.cr, 'biometric_device_job_active_uniq',
+                             self._table)
+            self.env.cr.execute("""
+                CREATE UNIQUE INDEX biometric_device_job_active_unique
+                    ON biometric_device_job (device_id, job_type)
+                 WHERE state IN ('pending', 'running')
+                   AND job_type != 'file_import'
+            """)
+
+    @api.depends('job_type')
+    def _compute_display_name(self):
+        """Name jobs after their operation and number"""
+        labels = dict(self._fields['job_type']._description_selection(self.env))
+        for job in self:
+            job.display_name = "%s #%s" % (labels.get(job.job_type), job.id or '')
+
+    @api.model
+    def _enqueue(self, device, job_type, values=None):
+        """Queue an operation on a device, unless the same operation is
+        already pending or running for it and may not be repeated
+
+        :param device: biometric.device.details record
+        :param job_type: operation, see ``job_type``
+        :param values: optional extra values of the job, e.g. the file of
+            a file import
+        :return: tuple of the job and whether it was created
+        """
+        domain = [('device_id', '=', device.id), ('job_type', '=', job_type),
+                  ('state', 'in', ('pending', 'running'))]
+        job = self.browse()
+        if job_type not in REPEATABLE_JOB_TYPES:
+            job = self.search(domain, limit=1)
+        if job:
+            return job, False
+        try:
+            with self.env.cr.savepoint():
+                job = self.create(dict(values or {}, device_id=device.id,
+                                       job_type=job_type))
+        except psycopg2.IntegrityError:
+            # queued concurrently by another request
+            return self.search(domain, limit=1), False
+        self._trigger_runner()
+        return job, True
+
+    @api.model
+    def _trigger_runner(self):
+        """Start the job runner as soon as a cron worker is available"""
+        cron = self.env.ref('hr_zk_attendance.ir_cron_run_device_jobs',
+                            raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    @api.model
+    def _cron_run_jobs(self, time_budget=JOB_RUNNER_TIME_BUDGET):
+        """Run the pending jobs in queue order, committing after each one.
+
+        Jobs are claimed with ``FOR UPDATE SKIP LOCKED`` so concurrent
+        runners never pick the same job. When the time budget is spent
+        the runner triggers itself again instead of exceeding the cron
+        time limit.
+        """
+        self._fail_stale_jobs()
+        deadline = time.monotonic() + time_budget
+        while time.monotonic() < deadline:
+            job = self._claim_next_job()
+            if not job:
+                return
+            job._run()
+        self._trigger_runner()
+
+    @api.model
+    def _fail_stale_jobs(self):
+        """Release the jobs left running by an interrupted runner"""
+        stale = self.search([
+            ('state', '=', 'running'),
+            ('date_started', '<', fields.Datetime.now() - timedelta(hours=STALE_JOB_HOURS)),
+        ])
+        if stale:
+            stale.write({'state': 'failed',
+                         'message': _('Interrupted before completion'),
+                         'date_finished': fields.Datetime.now()})
+            self.env.cr.commit()
+
+    @api.model
+    def _claim_next_job(self):
+        """Mark the oldest pending job as running
+
+        :return: the claimed job, empty when the queue is empty
+        """
+        self.env.cr.execute("""
+            SELECT id FROM biometric_device_job
+             WHERE state = 'pending'
+             ORDER BY id
+             LIMIT 1
+               FOR UPDATE SKIP LOCKED
+        """)
+        row = self.env.cr.fetchone()
+        if not row:
+            return self.browse()
+        job = self.browse(row[0])
+        job.write({'state': 'running', 'progress': 0.0,
+                   'date_started': fields.Datetime.now()})
+        self.env.cr.commit()
+        return job
+
+    def _run(self):
+        """Run a claimed job and store its outcome"""
+        self.ensure_one()
+        device = self.device_id.with_context(tz=self.user_id.tz)
+        try:
+            message = getattr(self, '_run_%s' % self.job_type)(device)
+        except Exception as e:
+            self.env.cr.rollback()
+            # drop the device id mapping of employees created by the job
+            self.env.registry.clear_cache()
+            _logger.error("Job %s on device %s failed: %s",
+                          self.display_name, device.name, str(e))
+            self.write({'state': 'failed', 'message': str(e),
+                        'date_finished': fields.Datetime.now()})
+        else:
+            self.write({'state': 'done', 'progress': 100.0,
+                        'message': message,
+                        'date_finished': fields.Datetime.now()})
+        self.env.cr.commit()
+
+    def _run_download(self, device):
+        """Download and import the attendance log of the device"""
+        device._download_device_logs(trigger='manual',
+                                     progress=self._set_progress)
+        if device.last_sync_state == 'failed':
+            raise UserError(device.last_sync_message)
+        return device.last_sync_message
+
+    def _run_clear(self, device):
+        """Clear the device log and purge the punches past the retention"""
+        cleared = device._clear_device_log()
+        self.env.cr.commit()
+        purged = device._purge_attendance(commit=True)
+        return _('Cleared %(cleared)s records from the device and purged '
+                 '%(purged)s punches from Odoo',
+                 cleared=cleared, purged=purged)
+
+    def _run_file_import(self, device):
+        """Import the attendance file of the job, streamed from the file
+        store and committed batch by batch, then drop the file"""
+        with self._open_file() as stream:
+            stats = device._import_file(stream, self.file_format or 'auto',
+                                        commit=True)
+        device._create_sync_log('file', {}, stats)
+        self.write({'file': False})
+        return _('%(imported)s imported, %(skipped)s already imported, '
+                 '%(unknown)s of unknown users and %(invalid)s invalid '
+                 'lines in %(elapsed)ss (%(rate)s lines/s)', **stats)
+
+    def _open_file(self):
+        """Return a binary stream of the file of the job, read from the
+        file store rather than loaded in memory when possible"""
+        self.ensure_one()
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name), ('res_field', '=', 'file'),
+            ('res_id', '=', self.id)], limit=1)
+        if not attachment:
+            raise UserError(_('The file of this job is missing.'))
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw or b'')
+
+    def _run_restart(self, device):
+        """Restart the device"""
+        device.action_restart_device()
+        return _('Device restart initiated')
+
+    def _set_progress(self, done, total):
+        """Record the progress of the job; committed along with the
+        imported batch"""
+        self.write({'progress': round(100.0 * done / total, 1) if total else 100.0})
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import base64
+import json
+import logging
+import zlib
+from collections import namedtuple
+from datetime import timedelta
+from odoo import api, fields, models, _
+from ..tools.zk_stream import count_records, iter_attendance_batches
+from .biometric_device_details import DEFAULT_IMPORT_BATCH_SIZE
+
+_logger = logging.getLogger(__name__)
+
+# Default number of days the raw device logs are kept
+DEFAULT_RAW_LOG_DAYS = 90
+
+# Enrolled user as needed to decode a stored log, see
+# :func:`..tools.zk_stream.iter_attendance_batches`
+RawUser = namedtuple('RawUser', ['uid', 'user_id'])
+
+
+class BiometricDeviceRawLog(models.Model):
+    """Raw attendance records fetched from a device, kept compressed so
+    that downloads can be replayed without the device"""
+    _name = 'biometric.device.raw.log'
+    _description = 'Biometric Device Raw Log'
+    _order = 'id desc'
+    _rec_name = 'device_id'
+
+    device_id = fields.Many2one('biometric.device.details', string='Device',
+                                required=True, ondelete='cascade', index=True,
+                                help='Device the records were read from')
+    company_id = fields.Many2one(related='device_id.company_id', store=True,
+                                 string='Company')
+    log_start = fields.Integer(string='From Position', readonly=True,
+                               help='Position in the device log of the first '
+                                    'stored record')
+    record_count = fields.Integer(string='Records', readonly=True)
+    record_size = fields.Integer(string='Record Size', readonly=True,
+                                 help='Size of one record in bytes, which '
+                                      'depends on the device firmware')
+    users = fields.Text(string='Users', readonly=True,
+                        help='Enrolled users as JSON (uid, user id)')
+    data = fields.Binary(string='Records Data', attachment=True,
+                         readonly=True, help='zlib compressed raw records')
+    raw_size = fields.Integer(string='Raw Size (bytes)', readonly=True)
+    compressed_size = fields.Integer(string='Stored Size (bytes)',
+                                     readonly=True)
+    replay_count = fields.Integer(string='Replays', readonly=True)
+    last_replay_date = fields.Datetime(string='Last Replay', readonly=True)
+
+    @api.model
+    def _store(self, device, data, record_size, start, users):
+        """Keep the records of a fetched log from position ``start`` on
+
+        :param device: biometric.device.details record
+        :param data: raw log bytes, see :func:`read_attendance_buffer`
+        :param record_size: size of one record in bytes
+        :param start: position of the first record to keep
+        :param users: pyzk ``User`` records enrolled on the device
+        :return: the created raw log, empty when there is nothing new
+        """
+        records = data[start * record_size:] if record_size else b''
+        if not records:
+            return self.browse()
+        compressed = zlib.compress(records)
+        return self.create({
+            'device_id': device.id,
+            'log_start': start,
+            'record_count': count_records(records, record_size),
+            'record_size': record_size,
+            'users': json.dumps([[user.uid, user.user_id] for user in users]),
+            'data': base64.b64encode(compressed),
+            'raw_size': len(records),
+            'compressed_size': len(compressed),
+        })
+
+    def _decode(self):
+        """Return the raw records and the users of the log"""
+        self.ensure_one()
+        data = zlib.decompress(base64.b64decode(self.data)) if self.data else b''
+        users = [RawUser(uid, user_id)
+                 for uid, user_id in json.loads(self.users or '[]')]
+        return data, users
+
+    def action_replay(self):
+        """Import the stored records again through the bulk pipeline.
+
+        The device is not contacted and its watermark is left alone;
+        records already imported are skipped by the usual dedup, so a
+        replay can be repeated safely.
+        """
+        totals = self._replay()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('Replayed %(processed)s records, %(imported)s '
+                             'were missing and imported', **totals),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def _replay(self, user_ids=None):
+        """Import the stored records again, see :meth:`action_replay`
+
+        :param user_ids: device user ids whose records are replayed, all
+            the records when None
+        :return: dict with the processed and imported record counts
+        """
+        totals = {'processed': 0, 'imported': 0}
+        for raw_log in self.sorted('id'):
+            device = raw_log.device_id
+            data, users = raw_log._decode()
+            for batch in iter_attendance_batches(
+                    data, raw_log.record_size, users,
+                    device.import_batch_size or DEFAULT_IMPORT_BATCH_SIZE):
+                if user_ids is not None:
+                    batch = [record for record in batch
+                             if record.user_id in user_ids]
+                    if not batch:
+                        continue
+                stats = device._import_attendance(batch, users)
+                totals['processed'] += stats['processed']
+                totals['imported'] += stats['imported']
+            raw_log.sudo().write({'replay_count': raw_log.replay_count + 1,
+                                  'last_replay_date': fields.Datetime.now()})
+        if totals['imported']:
+            self.env['biometric.device.details']._trigger_pairing()
+        return totals
+
+    @api.autovacuum
+    def _gc_raw_logs(self):
+        """Remove the raw logs older than the
+        ``hr_zk_attendance.raw_log_days`` system parameter"""
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_zk_attendance.raw_log_days', DEFAULT_RAW_LOG_DAYS))
+        self.search([
+            ('create_date', '<', fields.Datetime.now() - timedelta(days=days)),
+        ]).unlink()
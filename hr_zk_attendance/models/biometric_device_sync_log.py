@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+from datetime import timedelta
+from odoo import api, fields, models
+
+# Default number of days the sync history is kept
+DEFAULT_SYNC_LOG_DAYS = 90
+
+
+class BiometricDeviceSyncLog(models.Model):
+    """History of the attendance downloads of the biometric devices"""
+    _name = 'biometric.device.sync.log'
+    _description = 'Biometric Device Sync Log'
+    _order = 'create_date desc, id desc'
+    _rec_name = 'device_id'
+
+    device_id = fields.Many2one('biometric.device.details', string='Device',
+                                required=True, ondelete='cascade', index=True,
+                                help='Device the attendance was downloaded from')
+    company_id = fields.Many2one(related='device_id.company_id', store=True,
+                                 string='Company')
+    trigger = fields.Selection([('cron', 'Scheduled'), ('manual', 'Manual'),
+                                ('file', 'File Import')],
+                               string='Trigger', required=True,
+                               help='How the download was started')
+    state = fields.Selection([('success', 'Success'), ('failed', 'Failed')],
+                             string='Status', required=True)
+    error = fields.Text(string='Error', help='Reason of the failure')
+    attempts = fields.Integer(string='Attempts',
+                              help='Connection attempts made to the device')
+    connect_time = fields.Float(string='Connect Time (s)', aggregator='avg',
+                                help='Time spent connecting to the device')
+    fetch_time = fields.Float(string='Fetch Time (s)', aggregator='avg',
+                              help='Time spent reading the users and the '
+                                   'attendance log from the device')
+    import_time = fields.Float(string='DB Write Time (s)', aggregator='avg',
+                               help='Time spent importing the new records')
+    records_received = fields.Integer(
+        string='Received', help='Records past the watermark processed')
+    records_imported = fields.Integer(
+        string='Imported', help='Records inserted into the attendance table')
+    records_skipped = fields.Integer(
+        string='Skipped', help='Records already imported')
+    records_unknown = fields.Integer(
+        string='Unknown Users', help='Records of users without employee')
+    queries = fields.Integer(string='SQL Queries',
+                             help='Queries issued by the import')
+    log_size = fields.Integer(string='Device Log Size', aggregator='max',
+                              help='Records stored on the device')
+    watermark_start = fields.Integer(string='Watermark Before',
+                                     aggregator=None,
+                                     help='Log position imported before')
+    watermark_end = fields.Integer(string='Watermark After', aggregator=None,
+                                   help='Log position imported after')
+
+    @api.autovacuum
+    def _gc_sync_logs(self):
+        """Remove the history older than the
+        ``hr_zk_attendance.sync_log_days`` system parameter"""
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_zk_attendance.sync_log_days', DEFAULT_SYNC_LOG_DAYS))
+        self.search([
+            ('create_date', '<', fields.Datetime.now() - timedelta(days=days)),
+        ]).unlink()
@@ -19,20 +19,32 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 ################################################################################
-from odoo import fields, models, tools
+from odoo import api, fields, models, tools
 
 
 class DailyAttendance(models.Model):
-    """Model to hold data from the biometric device"""
+    """Last punch of every employee and day, duplicate punches aside.
+
+    The rows are materialized from zk.machine.attendance instead of being
+    computed by a view on every read: writers of punches call
+    :meth:`_refresh_days`, through
+    :meth:`zk.machine.attendance._refresh_reports`, with the
+    (employee, day) partitions they touched.
+    """
     _name = 'daily.attendance'
     _description = 'Daily Attendance Report'
-    _auto = False
     _order = 'punching_day desc'
 
+    attendance_id = fields.Many2one('zk.machine.attendance',
+                                    string='Punch', readonly=True,
+                                    ondelete='set null',
+                                    index='btree_not_null',
+                                    help='Punch shown by this row')
     employee_id = fields.Many2one('hr.employee', string='Employee',
-                                help='Employee Name', readonly=True)
+                                help='Employee Name', readonly=True,
+                                ondelete='cascade')
     punching_day = fields.Datetime(string='Date', help='Date of punching',
-                                readonly=True)
+                                readonly=True, index=True)
     address_id = fields.Many2one('res.partner', string='Working Address',
                               help='Working address of the employee',
                               readonly=True)
@@ -58,40 +70,103 @@ class DailyAttendance(models.Model):
     company_id = fields.Many2one('res.company', string='Company', readonly=True)
 
     def init(self):
-        """Initialize the SQL view for attendance report"""
-        tools.drop_view_if_exists(self.env.cr, 'daily_attendance')
+        """Create the unique partition index and fill the table on
+        installation.
+
+        The index keeps one row per employee and day when two transactions
+        refresh the same partition, rows left duplicated by earlier
+        versions are removed before creating it.
+        """
+        cr = self.env.cr
+        if not tools.index_exists(cr, 'daily_attendance_employee_day_unique'):
+            tools.drop_index(cr, 'daily_attendance_employee_day_index',
+                             self._table)
+            cr.execute("""
+                DELETE FROM daily_attendance d
+                USING daily_attendance o
+                WHERE o.employee_id = d.employee_id
+                AND o.punching_time::date = d.punching_time::date
+                AND o.id > d.id
+            """)
+            tools.create_unique_index(
+                cr, 'daily_attendance_employee_day_unique', self._table,
+                ['employee_id', '(punching_time::date)'])
+        if tools.table_exists(self.env.cr, 'zk_machine_attendance'):
+            self.env.cr.execute("SELECT 1 FROM daily_attendance LIMIT 1")
+            if not self.env.cr.rowcount:
+                self._refresh_all()
+
+    @api.model
+    def _refresh_all(self):
+        """Rebuild the whole table from zk.machine.attendance"""
+        self.env['zk.machine.attendance'].flush_model()
+        self.env.cr.execute("DELETE FROM daily_attendance")
+        self.env.cr.execute(self._refresh_query(""), {'uid': self.env.uid})
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_days(self, employee_days):
+        """Recompute the rows of the given partitions only
+
+        A row inserted meanwhile by a concurrent refresh of the same
+        partition is overwritten rather than duplicated; under the
+        repeatable read isolation of Odoo this raises a serialization
+        failure, the transaction is then retried with the other punches
+        visible.
+
+        :param employee_days: iterable of ``(employee_id, date)`` pairs,
+            the date being the UTC day of the punches
+        """
+        employee_days = set(employee_days)
+        if not employee_days:
+            return
+        self.env['zk.machine.attendance'].flush_model()
+        employee_ids, days = zip(*employee_days)
         self.env.cr.execute("""
-            CREATE OR REPLACE VIEW daily_attendance AS (
-                WITH latest_attendance AS (
-                    SELECT 
-                        id,
-                        employee_id,
-                        punching_time,
-                        write_date,
-                        address_id,
-                        attendance_type,
-                        punch_type,
-                        company_id,
-                        ROW_NUMBER() OVER (
-                            PARTITION BY employee_id, DATE(punching_time)
-                            ORDER BY punching_time DESC
-                        ) as rn
-                    FROM zk_machine_attendance
-                    WHERE employee_id IS NOT NULL
-                )
-                SELECT
-                    la.id as id,
-                    la.employee_id,
-                    la.punching_time as punching_day,
-                    la.address_id,
-                    la.attendance_type,
-                    la.punching_time,
-                    la.punch_type,
-                    la.company_id,
-                    e.name as employee_name
-                FROM latest_attendance la
-                JOIN hr_employee e ON la.employee_id = e.id
-                WHERE la.rn = 1
-                ORDER BY la.punching_time DESC
+            DELETE FROM daily_attendance d
+            USING unnest(%(employee_ids)s::int[], %(days)s::date[])
+                AS days(employee_id, day)
+            WHERE d.employee_id = days.employee_id
+            AND d.punching_time::date = days.day
+        """, {'employee_ids': list(employee_ids), 'days': list(days)})
+        self.env.cr.execute(self._refresh_query("""
+            JOIN unnest(%(employee_ids)s::int[], %(days)s::date[])
+                AS days(employee_id, day)
+            ON z.employee_id = days.employee_id
+            AND z.punching_time >= days.day
+            AND z.punching_time < days.day + 1
+        """), {'employee_ids': list(employee_ids), 'days': list(days),
+               'uid': self.env.uid})
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_query(self, join):
+        """Return the query inserting the last punch of each employee and
+        day of zk_machine_attendance, restricted by ``join``"""
+        return """
+            INSERT INTO daily_attendance (
+                attendance_id, employee_id, punching_day, punching_time,
+                address_id, attendance_type, punch_type, company_id,
+                create_uid, create_date, write_uid, write_date
             )
-        """)
+            SELECT DISTINCT ON (z.employee_id, z.punching_time::date)
+                z.id, z.employee_id, z.punching_time, z.punching_time,
+                z.address_id, z.attendance_type, z.punch_type, z.company_id,
+                %%(uid)s, now() at time zone 'UTC',
+                %%(uid)s, now() at time zone 'UTC'
+            FROM zk_machine_attendance z
+            %s
+            WHERE z.employee_id IS NOT NULL
+            AND z.punch_type != '255'
+            ORDER BY z.employee_id, z.punching_time::date, z.punching_time DESC
+            ON CONFLICT (employee_id, (punching_time::date)) DO UPDATE SET
+                attendance_id = EXCLUDED.attendance_id,
+                punching_day = EXCLUDED.punching_day,
+                punching_time = EXCLUDED.punching_time,
+                address_id = EXCLUDED.address_id,
+                attendance_type = EXCLUDED.attendance_type,
+                punch_type = EXCLUDED.punch_type,
+                company_id = EXCLUDED.company_id,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """ % join
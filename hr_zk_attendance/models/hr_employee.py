@@ -19,7 +19,7 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 ################################################################################
-from odoo import fields, models
+from odoo import api, fields, models, tools
 
 
 class HrEmployee(models.Model):
@@ -33,8 +33,58 @@ class HrEmployee(models.Model):
         index=True
     )
 
+    device_card = fields.Integer(
+        string='Badge Card Number',
+        help="Number of the access card enrolled on the biometric devices",
+        copy=False
+    )
+
     _sql_constraints = [
         ('unique_device_id',
          'UNIQUE(device_id_num)',
          'The Biometric Device ID must be unique!')
     ]
+
+    @api.model
+    @tools.ormcache()
+    def _get_device_employee_map(self):
+        """Return the employees of all companies, archived ones included,
+        by biometric device id.
+
+        The mapping is cached per registry and invalidated whenever a
+        ``device_id_num`` changes; callers must not modify it.
+
+        :return: dict of ``device_id_num`` to ``(employee_id, company_id)``
+        """
+        self.flush_model(['device_id_num', 'company_id'])
+        self.env.cr.execute("""
+            SELECT device_id_num, id, company_id
+            FROM hr_employee
+            WHERE device_id_num IS NOT NULL
+        """)
+        return {device_id_num: (employee_id, company_id)
+                for device_id_num, employee_id, company_id
+                in self.env.cr.fetchall()}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Invalidate the device id mapping for new device ids"""
+        employees = super().create(vals_list)
+        if any(vals.get('device_id_num') for vals in vals_list):
+            self.env.registry.clear_cache()
+        return employees
+
+    def write(self, vals):
+        """Invalidate the device id mapping when device ids move"""
+        res = super().write(vals)
+        if 'device_id_num' in vals or 'company_id' in vals:
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        """Invalidate the device id mapping of removed employees"""
+        has_device_id = any(self.mapped('device_id_num'))
+        res = super().unlink()
+        if has_device_id:
+            self.env.registry.clear_cache()
+        return res
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import logging
+from datetime import timedelta
+from odoo import api, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+# Default age in days after which punches are moved to the archive
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+# Number of punches moved per statement by the archival
+ARCHIVE_BATCH_SIZE = 10000
+
+
+class ZkAttendanceArchive(models.Model):
+    """Compact, append-only storage of old biometric punches.
+
+    Punches older than the ``hr_zk_attendance.archive_after_days`` system
+    parameter are moved here from zk.machine.attendance once paired, so
+    the hot table and its indexes only hold recent data. Rows carry no
+    write metadata and are indexed with a BRIN index on the punching time,
+    which stays a few pages large whatever the number of rows.
+    """
+    _name = 'zk.attendance.archive'
+    _description = 'Archived Biometric Device Attendance'
+    _order = 'punching_time DESC'
+    _log_access = False
+
+    employee_id = fields.Many2one('hr.employee', string='Employee',
+                                  readonly=True, ondelete='cascade')
+    device_id = fields.Many2one('biometric.device.details', string='Device',
+                                readonly=True, ondelete='set null')
+    device_id_num = fields.Char(string='Biometric Device ID', readonly=True)
+    punching_time = fields.Datetime(string='Punching Time', readonly=True)
+    punch_type = fields.Selection(
+        lambda self: self.env['zk.machine.attendance']._fields['punch_type'].selection,
+        string='Punching Type', readonly=True)
+    attendance_type = fields.Selection(
+        lambda self: self.env['zk.machine.attendance']._fields['attendance_type'].selection,
+        string='Category', readonly=True)
+    address_id = fields.Many2one('res.partner', string='Working Address',
+                                 readonly=True, ondelete='set null')
+    company_id = fields.Many2one('res.company', string='Company',
+                                 readonly=True, ondelete='cascade')
+
+    def init(self):
+        """Index the archive for time range and per-employee reads"""
+        tools.create_index(self.env.cr, 'zk_attendance_archive_time_brin',
+                           self._table, ['punching_time'], method='brin')
+        tools.create_index(self.env.cr, 'zk_attendance_archive_employee_index',
+                           self._table, ['employee_id', 'punching_time'])
+
+    @api.model
+    def _get_archive_cutoff(self):
+        """Return the time before which paired punches are archived, or
+        None when the archival is disabled"""
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_zk_attendance.archive_after_days', DEFAULT_ARCHIVE_AFTER_DAYS))
+        if days <= 0:
+            return None
+        return fields.Datetime.now() - timedelta(days=days)
+
+    @api.model
+    def _get_archived_until(self):
+        """Return the cutoff of the last archival run, punches older than
+        it are not imported again into the hot table"""
+        value = self.env['ir.config_parameter'].sudo().get_param(
+            'hr_zk_attendance.archived_until')
+        return fields.Datetime.to_datetime(value) if value else None
+
+    @api.model
+    def _cron_archive_punches(self):
+        """Move the paired punches older than the cutoff to the archive.
+
+        Each batch is moved by a single ``DELETE ... RETURNING`` feeding
+        an ``INSERT`` and committed on its own. Rows of daily.attendance
+        are kept: their punch reference is cleared by the foreign key.
+        """
+        cutoff = self._get_archive_cutoff()
+        if not cutoff:
+            return
+        self.env['zk.machine.attendance'].flush_model()
+        cr = self.env.cr
+        moved = 0
+        while True:
+            cr.execute("""
+                WITH moved AS (
+                    DELETE FROM zk_machine_attendance
+                    WHERE id IN (
+                        SELECT id FROM zk_machine_attendance
+                        WHERE punching_time < %(cutoff)s AND is_paired
+                        ORDER BY id
+                        LIMIT %(limit)s
+                    )
+                    RETURNING employee_id, device_id, device_id_num,
+                        punching_time, punch_type, attendance_type,
+                        address_id, company_id
+                )
+                INSERT INTO zk_attendance_archive (
+                    employee_id, device_id, device_id_num, punching_time,
+                    punch_type, attendance_type, address_id, company_id
+                )
+                SELECT employee_id, device_id, device_id_num, punching_time,
+                    punch_type, attendance_type, address_id, company_id
+                FROM moved
+            """, {'cutoff': cutoff, 'limit': ARCHIVE_BATCH_SIZE})
+            if not cr.rowcount:
+                break
+            moved += cr.rowcount
+            cr.commit()
+        self.env['ir.config_parameter'].sudo().set_param(
+            'hr_zk_attendance.archived_until', fields.Datetime.to_string(cutoff))
+        self.env['zk.machine.attendance'].invalidate_model()
+        _logger.info("Archived %s punches older than %s", moved, cutoff)
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+from datetime import timedelta
+from odoo import api, fields, models, tools
+from .zk_machine_attendance import DEFAULT_MAX_ATTENDANCE_HOURS
+
+
+class ZkAttendanceSummary(models.Model):
+    """Worked, break and overtime hours of every employee per day and per
+    month, computed from the punch types.
+
+    Like daily.attendance the rows are materialized: writers of punches
+    call :meth:`_refresh_days` with the (employee, UTC day) partitions
+    they touched, the day rows around these partitions are recomputed
+    from zk.machine.attendance and the month rows from the day rows.
+    Reports over long periods read these rows instead of the punches.
+
+    Days are local days in the timezone of the employee. Time is counted
+    between consecutive punches of the employee, across midnight: from a
+    Check In or Break In to the next Check Out or Break Out as worked,
+    from a Break Out to the next Break In as break and from an Overtime
+    In to the next Overtime Out as overtime, on the day of the opening
+    punch. Intervals longer than the
+    ``hr_zk_attendance.max_attendance_hours`` system parameter, unclosed
+    intervals and duplicates are not counted.
+    """
+    _name = 'zk.attendance.summary'
+    _description = 'Biometric Attendance Summary'
+    _order = 'date desc, employee_id'
+    _rec_name = 'employee_id'
+
+    employee_id = fields.Many2one('hr.employee', string='Employee',
+                                  readonly=True, ondelete='cascade')
+    company_id = fields.Many2one('res.company', string='Company',
+                                 readonly=True)
+    period = fields.Selection([('day', 'Day'), ('month', 'Month')],
+                              string='Period', readonly=True,
+                              help='Length of the period summarized by '
+                                   'the row')
+    date = fields.Date(string='Date', readonly=True,
+                       help='First day of the period')
+    first_punch = fields.Datetime(string='First Punch', readonly=True,
+                                  aggregator='min')
+    last_punch = fields.Datetime(string='Last Punch', readonly=True,
+                                 aggregator='max')
+    worked_hours = fields.Float(string='Worked Hours', readonly=True,
+                                aggregator='sum')
+    break_hours = fields.Float(string='Break Hours', readonly=True,
+                               aggregator='sum')
+    overtime_hours = fields.Float(string='Overtime Hours', readonly=True,
+                                  aggregator='sum')
+    punch_count = fields.Integer(string='Punches', readonly=True,
+                                 aggregator='sum')
+
+    _sql_constraints = [
+        ('unique_employee_period',
+         'UNIQUE(employee_id, period, date)',
+         'The period of this employee is already summarized!')
+    ]
+
+    def init(self):
+        """Fill the table on installation, the unique constraint indexes
+        the rows by employee"""
+        tools.create_index(self.env.cr, 'zk_attendance_summary_period_date_index',
+                           self._table, ['period', 'date'])
+        if tools.table_exists(self.env.cr, 'zk_machine_attendance'):
+            self.env.cr.execute("SELECT 1 FROM zk_attendance_summary LIMIT 1")
+            if not self.env.cr.rowcount:
+                self._refresh_all()
+
+    @api.model
+    def _get_query_params(self):
+        """Parameters shared by the refresh queries"""
+        return {
+            'uid': self.env.uid,
+            'max_hours': float(self.env['ir.config_parameter'].sudo().get_param(
+                'hr_zk_attendance.max_attendance_hours',
+                DEFAULT_MAX_ATTENDANCE_HOURS)),
+        }
+
+    @api.model
+    def _refresh_all(self):
+        """Rebuild the whole table from zk.machine.attendance"""
+        self.env['zk.machine.attendance'].flush_model()
+        self.env.cr.execute("DELETE FROM zk_attendance_summary")
+        params = self._get_query_params()
+        self.env.cr.execute(self._day_query("", ""), params)
+        self.env.cr.execute(self._month_query(""), params)
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_days(self, employee_days):
+        """Recompute the day rows around the given partitions and the month
+        rows containing them
+
+        A punch of a UTC day belongs to the local day before, the same or
+        the next one depending on the timezone, and may close an interval
+        opened the local day before: these three days are recomputed.
+        Rows inserted meanwhile by a concurrent refresh are overwritten
+        rather than duplicated; under the repeatable read isolation of
+        Odoo this raises a serialization failure and the transaction is
+        retried with the other punches visible.
+
+        :param employee_days: iterable of ``(employee_id, date)`` pairs,
+            the date being the UTC day of the punches
+        """
+        targets = {(employee_id, day + timedelta(days=offset))
+                   for employee_id, day in employee_days
+                   for offset in (-1, 0, 1)}
+        if not targets:
+            return
+        self.env['zk.machine.attendance'].flush_model()
+        self.flush_model()
+        employee_ids, days = zip(*targets)
+        params = dict(self._get_query_params(),
+                      employee_ids=list(employee_ids), days=list(days))
+        self.env.cr.execute("""
+            DELETE FROM zk_attendance_summary s
+            USING unnest(%(employee_ids)s::int[], %(days)s::date[])
+                AS days(employee_id, day)
+            WHERE s.period = 'day'
+            AND s.employee_id = days.employee_id
+            AND s.date = days.day
+        """, params)
+        # punches from the UTC day before the local day, for timezones
+        # ahead of UTC, to three days after, for the interval closing the
+        # day and timezones behind UTC
+        self.env.cr.execute(self._day_query("""
+            AND EXISTS (
+                SELECT 1
+                FROM unnest(%(employee_ids)s::int[], %(days)s::date[])
+                    AS days(employee_id, day)
+                WHERE days.employee_id = z.employee_id
+                AND z.punching_time >= days.day - 1
+                AND z.punching_time < days.day + 3
+            )
+        """, """
+            JOIN unnest(%(employee_ids)s::int[], %(days)s::date[])
+                AS days(employee_id, day)
+            ON p.employee_id = days.employee_id
+            AND p.day = days.day
+        """), params)
+        months = {(employee_id, day.replace(day=1))
+                  for employee_id, day in targets}
+        employee_ids, months = zip(*months)
+        params.update(employee_ids=list(employee_ids), months=list(months))
+        self.env.cr.execute("""
+            DELETE FROM zk_attendance_summary s
+            USING unnest(%(employee_ids)s::int[], %(months)s::date[])
+                AS months(employee_id, month)
+            WHERE s.period = 'month'
+            AND s.employee_id = months.employee_id
+            AND s.date = months.month
+        """, params)
+        self.env.cr.execute(self._month_query("""
+            JOIN unnest(%(employee_ids)s::int[], %(months)s::date[])
+                AS months(employee_id, month)
+            ON s.employee_id = months.employee_id
+            AND s.date >= months.month
+            AND s.date < months.month + interval '1 month'
+        """), params)
+        self.invalidate_model()
+
+    @api.model
+    def _day_query(self, where, join):
+        """Return the query inserting the day rows computed from the
+        punches of zk_machine_attendance selected by ``where``, keeping
+        the days matched by ``join``"""
+        return """
+            INSERT INTO zk_attendance_summary (
+                employee_id, company_id, period, date, first_punch,
+                last_punch, worked_hours, break_hours, overtime_hours,
+                punch_count, create_uid, create_date, write_uid, write_date
+            )
+            SELECT p.employee_id, max(p.company_id), 'day', p.day,
+                min(p.punching_time), max(p.punching_time),
+                coalesce(sum(p.hours) FILTER (
+                    WHERE p.punch_type IN ('0', '3')
+                    AND p.next_type IN ('1', '2')
+                    AND p.hours <= %%(max_hours)s), 0),
+                coalesce(sum(p.hours) FILTER (
+                    WHERE p.punch_type = '2' AND p.next_type = '3'
+                    AND p.hours <= %%(max_hours)s), 0),
+                coalesce(sum(p.hours) FILTER (
+                    WHERE p.punch_type = '4' AND p.next_type = '5'
+                    AND p.hours <= %%(max_hours)s), 0),
+                count(*),
+                %%(uid)s, now() at time zone 'UTC',
+                %%(uid)s, now() at time zone 'UTC'
+            FROM (
+                SELECT z.employee_id, z.company_id, z.punch_type,
+                    z.punching_time,
+                    (z.punching_time AT TIME ZONE 'UTC'
+                        AT TIME ZONE coalesce(r.tz, 'UTC'))::date AS day,
+                    lead(z.punch_type) OVER w AS next_type,
+                    extract(epoch FROM lead(z.punching_time) OVER w
+                        - z.punching_time) / 3600.0 AS hours
+                FROM zk_machine_attendance z
+                JOIN hr_employee e ON e.id = z.employee_id
+                LEFT JOIN resource_resource r ON r.id = e.resource_id
+                WHERE z.punch_type != '255'
+                %s
+                WINDOW w AS (PARTITION BY z.employee_id
+                             ORDER BY z.punching_time)
+            ) p
+            %s
+            GROUP BY p.employee_id, p.day
+            ON CONFLICT (employee_id, period, date) DO UPDATE SET
+                company_id = EXCLUDED.company_id,
+                first_punch = EXCLUDED.first_punch,
+                last_punch = EXCLUDED.last_punch,
+                worked_hours = EXCLUDED.worked_hours,
+                break_hours = EXCLUDED.break_hours,
+                overtime_hours = EXCLUDED.overtime_hours,
+                punch_count = EXCLUDED.punch_count,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """ % (where, join)
+
+    @api.model
+    def _month_query(self, join):
+        """Return the query inserting the month rows summed from the day
+        rows, restricted by ``join``"""
+        return """
+            INSERT INTO zk_attendance_summary (
+                employee_id, company_id, period, date, first_punch,
+                last_punch, worked_hours, break_hours, overtime_hours,
+                punch_count, create_uid, create_date, write_uid, write_date
+            )
+            SELECT s.employee_id, max(s.company_id), 'month',
+                date_trunc('month', s.date)::date,
+                min(s.first_punch), max(s.last_punch), sum(s.worked_hours),
+                sum(s.break_hours), sum(s.overtime_hours),
+                sum(s.punch_count),
+                %%(uid)s, now() at time zone 'UTC',
+                %%(uid)s, now() at time zone 'UTC'
+            FROM zk_attendance_summary s
+            %s
+            WHERE s.period = 'day'
+            GROUP BY s.employee_id, date_trunc('month', s.date)
+            ON CONFLICT (employee_id, period, date) DO UPDATE SET
+                company_id = EXCLUDED.company_id,
+                first_punch = EXCLUDED.first_punch,
+                last_punch = EXCLUDED.last_punch,
+                worked_hours = EXCLUDED.worked_hours,
+                break_hours = EXCLUDED.break_hours,
+                overtime_hours = EXCLUDED.overtime_hours,
+                punch_count = EXCLUDED.punch_count,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """ % join
@@ -19,7 +19,31 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 ################################################################################
-from odoo import api, fields, models
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from psycopg2.extras import execute_values
+from odoo import api, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+# Punch types opening and closing an hr.attendance interval
+PAIRING_IN_TYPES = ('0', '3', '4')  # Check In, Break In, Overtime In
+PAIRING_OUT_TYPES = ('1', '2', '5')  # Check Out, Break Out, Overtime Out
+# Default longest interval, an open interval older than this is stale
+DEFAULT_MAX_ATTENDANCE_HOURS = 16
+# Number of punches removed per DELETE statement by a purge
+PURGE_BATCH_SIZE = 5000
+# Default window in seconds within which repeated punches of an employee
+# are duplicates
+DEFAULT_DUPLICATE_WINDOW = 30
+# Number of punches read per query by the export API
+EXPORT_PAGE_SIZE = 2000
+# Columns of the export API, in output order
+EXPORT_COLUMNS = ('id', 'employee_id', 'employee_name', 'device_id_num',
+                  'punching_time', 'punch_type', 'attendance_type',
+                  'device_id', 'address_id', 'company_id', 'clock_suspect',
+                  'create_date', 'change_xid')
 
 
 class ZkMachineAttendance(models.Model):
@@ -32,23 +56,19 @@ class ZkMachineAttendance(models.Model):
         'hr.employee', 
         string='Employee',
         required=True,
-        index=True,
         ondelete='cascade'
     )
     check_in = fields.Datetime(
         string='Check In',
         default=fields.Datetime.now,
-        required=True,
-        index=True
+        required=True
     )
     check_out = fields.Datetime(
-        string='Check Out',
-        index=True
+        string='Check Out'
     )
     device_id_num = fields.Char(
         string='Biometric Device ID',
         help="The ID of the Biometric Device",
-        index=True,
         required=True
     )
     punch_type = fields.Selection([
@@ -79,21 +99,52 @@ class ZkMachineAttendance(models.Model):
     punching_time = fields.Datetime(
         string='Punching Time',
         help="Punching time in the device",
-        index=True,
         required=True
     )
+    device_id = fields.Many2one(
+        'biometric.device.details',
+        string='Device',
+        help="Device the punch was downloaded from",
+        ondelete='set null'
+    )
     address_id = fields.Many2one(
         'res.partner',
         string='Working Address',
-        help="Working address of the employee",
-        index=True
+        help="Working address of the employee"
     )
     company_id = fields.Many2one(
         'res.company',
         string='Company',
         related='employee_id.company_id',
-        store=True,
-        index=True
+        store=True
+    )
+    hr_attendance_id = fields.Many2one(
+        'hr.attendance',
+        string='Attendance',
+        help="Attendance interval built from this punch",
+        ondelete='set null',
+        index='btree_not_null'
+    )
+    clock_suspect = fields.Boolean(
+        string='Clock Suspect',
+        help="The device clock drifted beyond its tolerance around this "
+             "punch, its time may be wrong",
+        default=False,
+        copy=False
+    )
+    is_paired = fields.Boolean(
+        string='Paired',
+        help="The punch has been processed by the pairing engine",
+        default=False,
+        copy=False
+    )
+    pairing_review = fields.Boolean(
+        string='Pairing Review',
+        help="The punch is older than the latest interval of the employee "
+             "and that interval was not built from punches, it is left "
+             "unpaired until someone reviews it",
+        default=False,
+        copy=False
     )
 
     _sql_constraints = [
@@ -102,6 +153,47 @@ class ZkMachineAttendance(models.Model):
          'Duplicate attendance record detected!')
     ]
 
+    def init(self):
+        """Index the table for its actual access paths only.
+
+        Besides the ``unique_device_punch`` key used for deduplication,
+        reads go through the employee time line (daily report, pairing,
+        summaries), the company scope, the device (purge), the working
+        address (export API) and the unpaired punches (pairing cron).
+        Single-column indexes on the other fields are not created since
+        every insert would pay for them.
+
+        The ``change_xid`` column, outside of the ORM, records the id of
+        the transaction inserting each punch for the change feed of
+        :meth:`_iter_export`. Punches inserted before it existed read 0.
+        """
+        cr = self.env.cr
+        if not tools.column_exists(cr, self._table, 'change_xid'):
+            cr.execute("""
+                ALTER TABLE zk_machine_attendance
+                    ADD COLUMN change_xid bigint NOT NULL DEFAULT 0
+            """)
+            cr.execute("""
+                ALTER TABLE zk_machine_attendance
+                    ALTER COLUMN change_xid SET DEFAULT txid_current()
+            """)
+        tools.create_index(cr, 'zk_machine_attendance_change_index',
+                           self._table, ['change_xid', 'id'])
+        tools.drop_index(cr, 'zk_machine_attendance_employee_day_index', self._table)
+        tools.create_index(cr, 'zk_machine_attendance_employee_time_index',
+                           self._table, ['employee_id', 'punching_time'])
+        tools.create_index(cr, 'zk_machine_attendance_company_time_index',
+                           self._table, ['company_id', 'punching_time'])
+        tools.create_index(cr, 'zk_machine_attendance_device_time_index',
+                           self._table, ['device_id', 'punching_time'],
+                           where='device_id IS NOT NULL')
+        tools.create_index(cr, 'zk_machine_attendance_address_time_index',
+                           self._table, ['address_id', 'punching_time'],
+                           where='address_id IS NOT NULL')
+        tools.create_index(cr, 'zk_machine_attendance_unpaired_index',
+                           self._table, ['punching_time'],
+                           where='is_paired IS NOT TRUE')
+
     @api.model_create_multi
     def create(self, vals_list):
         """Override create to properly handle check-in/check-out"""
@@ -110,4 +202,518 @@ class ZkMachineAttendance(models.Model):
                 vals['check_in'] = vals.get('punching_time')
             elif vals.get('punch_type') == '1':  # Check Out
                 vals['check_out'] = vals.get('punching_time')
-        return super().create(vals_list)
+        records = super().create(vals_list)
+        self._refresh_reports(records._get_employee_days())
+        return records
+
+    def write(self, vals):
+        """Refresh the daily report of the days the punches move from/to"""
+        employee_days = self._get_employee_days()
+        res = super().write(vals)
+        self._refresh_reports(
+            employee_days | self._get_employee_days())
+        return res
+
+    def unlink(self):
+        """Refresh the daily report of the days of the removed punches"""
+        employee_days = self._get_employee_days()
+        res = super().unlink()
+        self._refresh_reports(employee_days)
+        return res
+
+    @api.model
+    def _refresh_reports(self, employee_days, summary=True):
+        """Refresh daily.attendance and zk.attendance.summary for the
+        given ``(employee_id, UTC date)`` partitions
+
+        :param summary: also refresh zk.attendance.summary, left out when
+            punches are purged so that the hours of the purged history
+            are kept, as they are by archival
+        """
+        employee_days = set(employee_days)
+        self.env['daily.attendance']._refresh_days(employee_days)
+        if summary:
+            self.env['zk.attendance.summary']._refresh_days(employee_days)
+
+    def _get_employee_days(self):
+        """Return the set of (employee_id, UTC date) pairs of the punches"""
+        return {(rec.employee_id.id, rec.punching_time.date())
+                for rec in self if rec.employee_id and rec.punching_time}
+
+    @api.model
+    def _insert_punches(self, vals_list):
+        """Insert punches with a single multi-row statement.
+
+        Rows colliding with the ``unique_device_punch`` constraint are
+        skipped by ``ON CONFLICT DO NOTHING``, so callers do not need to
+        look up existing punches first. The check-in/check-out handling
+        mirrors :meth:`create`, and the reports are refreshed for the days
+        that received new punches.
+
+        :param vals_list: list of dicts with the same keys as :meth:`create`
+        :return: list of ids of the inserted rows
+        """
+        if not vals_list:
+            return []
+        self.flush_model()
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        rows = []
+        for vals in vals_list:
+            punching_time = vals['punching_time']
+            punch_type = vals.get('punch_type') or '0'
+            rows.append((
+                vals['employee_id'],
+                vals.get('device_id') or None,
+                vals['device_id_num'],
+                punching_time,
+                punching_time if punch_type == '0' else now,
+                punching_time if punch_type == '1' else None,
+                punch_type,
+                vals.get('attendance_type') or '1',
+                vals.get('address_id') or None,
+                vals.get('company_id') or None,
+                bool(vals.get('clock_suspect')),
+                uid, now, uid, now,
+            ))
+        result = execute_values(self.env.cr, """
+            INSERT INTO zk_machine_attendance (
+                employee_id, device_id, device_id_num, punching_time, check_in,
+                check_out, punch_type, attendance_type, address_id,
+                company_id, clock_suspect, create_uid, create_date, write_uid,
+                write_date
+            )
+            VALUES %s
+            ON CONFLICT (device_id_num, punching_time) DO NOTHING
+            RETURNING id, employee_id, punching_time::date
+        """, rows, page_size=len(rows), fetch=True)
+        self._refresh_reports(
+            (employee_id, day) for _id, employee_id, day in result)
+        return [row[0] for row in result]
+
+    @api.model
+    def _iter_export(self, company_ids, address_id=None, date_from=None,
+                     date_to=None, after=None, since=None,
+                     duplicates=False, limit=None):
+        """Yield punches for the export API, reading them page by page.
+
+        Pages are fetched by keyset rather than offset so that every query
+        costs the same however deep the export goes: punches are sorted on
+        ``(punching_time, id)`` and a page starts right after the last row
+        of the previous one.
+
+        When ``since`` is given the punches are sorted on
+        ``(change_xid, id)`` instead, which lets a consumer pull the
+        punches created since its last call whatever their punching time.
+        Only punches of transactions older than the oldest transaction
+        still running are returned (``txid_snapshot_xmin``): their set is
+        final, so a cursor can never move past punches committed later,
+        however long the transaction inserting them lasts.
+
+        Rows are read with plain SQL, access rights must be checked by the
+        caller and ``company_ids`` restricted to the allowed companies.
+
+        :param company_ids: list of ids of the companies to export
+        :param address_id: optional working address id
+        :param date_from: optional inclusive lower bound, UTC datetime
+        :param date_to: optional exclusive upper bound, UTC datetime
+        :param after: optional ``(punching_time, id)`` of the last row of
+            the previous call
+        :param since: optional ``(change_xid, id)`` of the last row of the
+            previous call of the change feed, ``(0, 0)`` for the first
+        :param duplicates: also export the punches marked as duplicates
+        :param limit: maximum number of rows
+        :return: generator of dicts keyed by ``EXPORT_COLUMNS``
+        """
+        where = ['a.company_id = ANY(%s)']
+        params = [list(company_ids)]
+        if address_id:
+            where.append('a.address_id = %s')
+            params.append(address_id)
+        if date_from:
+            where.append('a.punching_time >= %s')
+            params.append(date_from)
+        if date_to:
+            where.append('a.punching_time < %s')
+            params.append(date_to)
+        if not duplicates:
+            where.append("a.punch_type != '255'")
+        if since is not None:
+            where.append('a.change_xid < '
+                         'txid_snapshot_xmin(txid_current_snapshot())')
+            keyset, order = '(a.change_xid, a.id) > (%s, %s)', \
+                'a.change_xid, a.id'
+        else:
+            keyset, order = '(a.punching_time, a.id) > (%s, %s)', \
+                'a.punching_time, a.id'
+        query = """
+            SELECT a.id, a.employee_id, e.name, a.device_id_num,
+                   a.punching_time, a.punch_type, a.attendance_type,
+                   a.device_id, a.address_id, a.company_id, a.clock_suspect,
+                   a.create_date, a.change_xid
+              FROM zk_machine_attendance a
+              JOIN hr_employee e ON e.id = a.employee_id
+             WHERE %s
+             ORDER BY %s
+             LIMIT %%s
+        """
+        self.flush_model()
+        last = since if since is not None else after
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = EXPORT_PAGE_SIZE if remaining is None \
+                else min(EXPORT_PAGE_SIZE, remaining)
+            conditions = list(where)
+            page_params = list(params)
+            if last is not None:
+                conditions.append(keyset)
+                page_params.extend(last)
+            self.env.cr.execute(
+                query % (' AND '.join(conditions), order),
+                page_params + [page_size])
+            rows = self.env.cr.fetchall()
+            for row in rows:
+                yield dict(zip(EXPORT_COLUMNS, row))
+            if len(rows) < page_size:
+                return
+            last = (rows[-1][12], rows[-1][0]) if since is not None \
+                else (rows[-1][4], rows[-1][0])
+            if remaining is not None:
+                remaining -= len(rows)
+
+    @api.model
+    def _collapse_duplicates(self, vals_list):
+        """Collapse the punches of an employee repeated within a short
+        window, on one device or on several.
+
+        The window in seconds and the handling of the duplicates come
+        from the ``hr_zk_attendance.duplicate_window`` (0 disables) and
+        ``hr_zk_attendance.duplicate_mode`` (``mark`` to store them with
+        the ``255`` punch type, ``drop`` to discard them) system
+        parameters. The new punches and the stored punches around them
+        are swept in time order per employee: a new punch is a duplicate
+        when the previous kept punch is less than the window older.
+        Stored punches are never changed. New punches already stored with
+        the same ``(device_id_num, punching_time)``, as presented again by
+        a full resync, are left out of the result without being counted
+        as duplicates.
+
+        :param vals_list: punch values as passed to :meth:`_insert_punches`
+        :return: tuple of the values to insert and the number of duplicates
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        window = timedelta(seconds=int(params.get_param(
+            'hr_zk_attendance.duplicate_window', DEFAULT_DUPLICATE_WINDOW)))
+        if not vals_list or not window:
+            return vals_list, 0
+        drop = params.get_param('hr_zk_attendance.duplicate_mode', 'mark') == 'drop'
+        timeline = defaultdict(list)
+        for vals in vals_list:
+            timeline[vals['employee_id']].append((vals['punching_time'], 1, vals))
+        times = [vals['punching_time'] for vals in vals_list]
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT employee_id, punching_time, device_id_num, punch_type
+            FROM zk_machine_attendance
+            WHERE employee_id = ANY(%s)
+            AND punching_time >= %s AND punching_time <= %s
+        """, (list(timeline), min(times) - window, max(times)))
+        stored = set()
+        for employee_id, punching_time, device_id_num, punch_type \
+                in self.env.cr.fetchall():
+            stored.add((device_id_num, punching_time))
+            if punch_type != '255':
+                timeline[employee_id].append((punching_time, 0, None))
+        result = []
+        duplicates = 0
+        for punches in timeline.values():
+            punches.sort(key=lambda punch: punch[:2])
+            last_kept = None
+            for punching_time, is_new, vals in punches:
+                if is_new and (vals['device_id_num'], punching_time) in stored:
+                    continue
+                if last_kept is not None and is_new \
+                        and punching_time - last_kept < window:
+                    duplicates += 1
+                    if not drop:
+                        result.append(dict(vals, punch_type='255'))
+                    continue
+                last_kept = punching_time
+                if is_new:
+                    result.append(vals)
+        return result, duplicates
+
+    @api.model
+    def _purge_punches(self, domain_sql, params, commit=False):
+        """Delete punches in batches of ``PURGE_BATCH_SIZE`` rows
+
+        Each batch is a short DELETE by primary key, so the table is never
+        locked for long, and daily.attendance is refreshed for the days
+        that lost punches. zk.attendance.summary keeps the hours of the
+        purged punches.
+
+        :param domain_sql: SQL condition on ``zk_machine_attendance``
+            selecting the punches to delete
+        :param params: parameters of ``domain_sql``
+        :param commit: commit the transaction after every batch
+        :return: number of deleted punches
+        """
+        self.flush_model()
+        deleted = 0
+        while True:
+            self.env.cr.execute("""
+                DELETE FROM zk_machine_attendance
+                WHERE id IN (
+                    SELECT id FROM zk_machine_attendance
+                    WHERE %s
+                    ORDER BY id
+                    LIMIT %%(limit)s
+                )
+                RETURNING employee_id, punching_time::date
+            """ % domain_sql, dict(params, limit=PURGE_BATCH_SIZE))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                break
+            deleted += len(rows)
+            self._refresh_reports(rows, summary=False)
+            if commit:
+                self.env.cr.commit()
+        self.invalidate_model()
+        return deleted
+
+    @api.model
+    def _cron_pair_punches(self, limit=50000):
+        """Pair the oldest punches not processed yet into hr.attendance"""
+        self.search([('is_paired', '=', False),
+                     ('pairing_review', '=', False)],
+                    order='punching_time', limit=limit)._pair_punches()
+
+    def _pair_punches(self):
+        """Build or extend hr.attendance intervals from the punches.
+
+        The punches of each employee are walked in time order, starting
+        from the latest existing interval of the employee: in-punches
+        (check in, break in, overtime in) open an interval, out-punches
+        (check out, break out, overtime out) close it or extend the check
+        out of the last closed interval. Duplicate (``255``) punches and
+        punches older than the interval they would change are ignored.
+        An interval left open longer than the
+        ``hr_zk_attendance.max_attendance_hours`` system parameter is
+        closed at its check in.
+
+        A punch older than the latest interval of its employee (a device
+        back online, a replayed raw log, a file import) re-plans the
+        intervals from that punch on, see :meth:`_get_replan`; when one
+        of these intervals was not built from punches the late punches
+        are flagged for review instead.
+
+        New intervals are created in one batch; only the latest existing
+        interval of an employee may be written. The processed punches are
+        flagged as paired, except those of the employees whose intervals
+        could not be written, which are retried by the next run.
+        """
+        punches = self.filtered(lambda punch: not punch.is_paired)
+        if not punches:
+            return
+        max_gap = timedelta(hours=float(
+            self.env['ir.config_parameter'].sudo().get_param(
+                'hr_zk_attendance.max_attendance_hours',
+                DEFAULT_MAX_ATTENDANCE_HOURS)))
+        by_employee = defaultdict(list)
+        for punch in punches.sorted('punching_time'):
+            by_employee[punch.employee_id.id].append(punch)
+        last_attendances = self._get_last_attendances(list(by_employee))
+        plans = []
+        review = self.browse()
+        for employee_id, employee_punches in by_employee.items():
+            last_attendance = last_attendances.get(employee_id)
+            obsolete = self.env['hr.attendance']
+            late = [punch for punch in employee_punches if last_attendance
+                    and punch.punching_time < last_attendance.check_in]
+            if late:
+                replan = self._get_replan(employee_id, late[0].punching_time)
+                if replan is None:
+                    _logger.warning("Punches %s of employee %s predate an "
+                                    "interval not built from punches, left "
+                                    "for review", [p.id for p in late],
+                                    employee_id)
+                    review |= self.browse([punch.id for punch in late])
+                    employee_punches = [punch for punch in employee_punches
+                                        if punch not in late]
+                else:
+                    obsolete, last_attendance, replayed = replan
+                    employee_punches = sorted(
+                        set(employee_punches) | set(replayed),
+                        key=lambda punch: (punch.punching_time, punch.id))
+            plans.append((employee_id, obsolete, self._plan_intervals(
+                employee_punches, last_attendance, max_gap)))
+        failed = set()
+        try:
+            with self.env.cr.savepoint():
+                links = self._apply_interval_plans(plans)
+        except Exception as e:
+            _logger.warning("Batch pairing failed (%s), pairing employee "
+                            "by employee", e)
+            links = []
+            for plan in plans:
+                try:
+                    with self.env.cr.savepoint():
+                        links += self._apply_interval_plans([plan])
+                except Exception as error:
+                    failed.add(plan[0])
+                    _logger.warning("Could not pair the punches of employee "
+                                    "%s: %s", plan[0], error)
+        paired = punches - review
+        if failed:
+            paired = paired.filtered(
+                lambda punch: punch.employee_id.id not in failed)
+        self.flush_model(['hr_attendance_id', 'is_paired', 'pairing_review'])
+        if links:
+            punch_ids, attendance_ids = zip(*links)
+            self.env.cr.execute("""
+                UPDATE zk_machine_attendance z
+                SET hr_attendance_id = links.attendance_id
+                FROM unnest(%s::int[], %s::int[]) AS links(id, attendance_id)
+                WHERE z.id = links.id
+            """, (list(punch_ids), list(attendance_ids)))
+        self.env.cr.execute("""
+            UPDATE zk_machine_attendance SET is_paired = TRUE
+            WHERE id = ANY(%s)
+        """, (paired.ids,))
+        if review:
+            self.env.cr.execute("""
+                UPDATE zk_machine_attendance SET pairing_review = TRUE
+                WHERE id = ANY(%s)
+            """, (review.ids,))
+        self.invalidate_model(['hr_attendance_id', 'is_paired',
+                               'pairing_review'])
+
+    @api.model
+    def _get_replan(self, employee_id, punch_time):
+        """Prepare the re-planning of the intervals of an employee from a
+        punch older than the latest one
+
+        The intervals ending after the punch are dropped and all the
+        punches of the employee from the start of the earliest of them
+        are planned again from the interval before.
+
+        :param employee_id: id of the employee
+        :param punch_time: time of the earliest late punch
+        :return: ``(obsolete, last_attendance, punches)`` with the
+            hr.attendance records to delete, the interval to plan from
+            (or None) and the punches to plan again, or None when one of
+            the intervals to drop was not built from punches
+        """
+        Attendance = self.env['hr.attendance'].sudo()
+        obsolete = Attendance.search([
+            ('employee_id', '=', employee_id),
+            '|', ('check_out', '=', False), ('check_out', '>=', punch_time),
+        ])
+        linked = self.search([('hr_attendance_id', 'in', obsolete.ids)])
+        if obsolete - linked.hr_attendance_id:
+            return None
+        start = min(obsolete.mapped('check_in') + [punch_time])
+        last_attendance = Attendance.search([
+            ('employee_id', '=', employee_id),
+            ('check_in', '<', start),
+        ], order='check_in desc', limit=1)
+        punches = self.search([
+            ('employee_id', '=', employee_id),
+            ('punching_time', '>=', start),
+        ], order='punching_time, id')
+        return obsolete, last_attendance or None, list(punches)
+
+    @api.model
+    def _get_last_attendances(self, employee_ids):
+        """Return the latest hr.attendance of each employee by employee id"""
+        self.env['hr.attendance'].flush_model()
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (employee_id) employee_id, id
+            FROM hr_attendance
+            WHERE employee_id = ANY(%s)
+            ORDER BY employee_id, check_in DESC
+        """, (employee_ids,))
+        rows = self.env.cr.fetchall()
+        attendances = self.env['hr.attendance'].sudo().browse(
+            [attendance_id for _employee_id, attendance_id in rows])
+        return {attendance.employee_id.id: attendance
+                for attendance in attendances}
+
+    @api.model
+    def _plan_intervals(self, punches, last_attendance, max_gap):
+        """Compute the intervals of one employee, see :meth:`_pair_punches`
+
+        :param punches: punches of the employee sorted by time
+        :param last_attendance: latest hr.attendance of the employee
+        :param max_gap: longest allowed interval
+        :return: list of interval dicts with the ``record`` (existing
+            hr.attendance or ``None``), ``check_in``, ``check_out`` and
+            the ``punch_ids`` belonging to the interval, the existing
+            interval first
+        """
+        current = None
+        if last_attendance:
+            current = {'record': last_attendance,
+                       'check_in': last_attendance.check_in,
+                       'check_out': last_attendance.check_out,
+                       'punch_ids': []}
+        intervals = [current] if current else []
+        for punch in punches:
+            punch_time = punch.punching_time
+            if '255' in (punch.punch_type, punch.attendance_type):
+                continue
+            if current and not current['check_out'] \
+                    and punch_time - current['check_in'] > max_gap:
+                current['check_out'] = current['check_in']
+            is_open = current and not current['check_out']
+            if punch.punch_type in PAIRING_IN_TYPES:
+                if is_open:
+                    current['punch_ids'].append(punch.id)
+                elif not current or punch_time > current['check_out']:
+                    current = {'record': None, 'check_in': punch_time,
+                               'check_out': False, 'punch_ids': [punch.id]}
+                    intervals.append(current)
+            elif punch.punch_type in PAIRING_OUT_TYPES and current:
+                if is_open and punch_time >= current['check_in']:
+                    current['check_out'] = punch_time
+                    current['punch_ids'].append(punch.id)
+                elif not is_open and punch_time > current['check_out'] \
+                        and punch_time - current['check_in'] <= max_gap:
+                    current['check_out'] = punch_time
+                    current['punch_ids'].append(punch.id)
+        return intervals
+
+    @api.model
+    def _apply_interval_plans(self, plans):
+        """Write the intervals computed by :meth:`_plan_intervals`
+
+        :param plans: list of ``(employee_id, obsolete, intervals)``
+            triples, ``obsolete`` being the hr.attendance records replaced
+            by the intervals
+        :return: list of ``(punch_id, hr_attendance_id)`` links
+        """
+        Attendance = self.env['hr.attendance'].sudo()
+        new_intervals = []
+        links = []
+        for _employee_id, obsolete, _intervals in plans:
+            obsolete.sudo().unlink()
+        for employee_id, _obsolete, intervals in plans:
+            for interval in intervals:
+                record = interval['record']
+                if not record:
+                    interval['employee_id'] = employee_id
+                    new_intervals.append(interval)
+                    continue
+                if interval['check_out'] != record.check_out:
+                    record.write({'check_out': interval['check_out']})
+                links += [(punch_id, record.id)
+                          for punch_id in interval['punch_ids']]
+        records = Attendance.create([{
+            'employee_id': interval['employee_id'],
+            'check_in': interval['check_in'],
+            'check_out': interval['check_out'],
+        } for interval in new_intervals])
+        for interval, record in zip(new_intervals, records):
+            links += [(punch_id, record.id)
+                      for punch_id in interval['punch_ids']]
+        return links
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import logging
+from collections import defaultdict
+from psycopg2.extras import execute_values
+from odoo import api, fields, models
+from ..tools.zk_push import PushAttendance
+from .biometric_device_details import SnapshotUser
+
+_logger = logging.getLogger(__name__)
+
+# Number of buffered punches imported per micro-batch
+PUSH_BATCH_SIZE = 5000
+
+
+class ZkPushPunch(models.Model):
+    """Punches received from devices through the push protocol, buffered
+    until the micro-batch importer moves them to zk.machine.attendance.
+
+    The push controller only appends rows here so that devices get their
+    acknowledgement without waiting for the import.
+    """
+    _name = 'zk.push.punch'
+    _description = 'Buffered Pushed Punch'
+    _order = 'id'
+    _log_access = False
+
+    device_id = fields.Many2one('biometric.device.details', string='Device',
+                                required=True, ondelete='cascade')
+    device_id_num = fields.Char(string='Biometric Device ID', required=True,
+                                help='User ID on the device')
+    device_time = fields.Datetime(string='Device Time', required=True,
+                                  help='Punch time in the device timezone')
+    status = fields.Integer(string='Punch State')
+    verify = fields.Integer(string='Verification Method')
+    received_at = fields.Datetime(string='Received At', required=True,
+                                  default=fields.Datetime.now)
+    held = fields.Boolean(string='Held', default=False,
+                          help='The user is queued for review in '
+                               'zk.unmapped.user, the punch is kept until '
+                               'the user is mapped or ignored')
+
+    @api.model
+    def _buffer_rows(self, device, rows):
+        """Append parsed ``ATTLOG`` rows to the buffer in one statement and
+        schedule their import
+
+        :param device: biometric.device.details record
+        :param rows: ``(pin, time, status, verify)`` tuples, see
+            :func:`..tools.zk_push.parse_attlog`
+        """
+        if not rows:
+            return
+        now = fields.Datetime.now()
+        execute_values(self.env.cr, """
+            INSERT INTO zk_push_punch (
+                device_id, device_id_num, device_time, status, verify,
+                received_at
+            ) VALUES %s
+        """, [(device.id, pin, punch_time, status, verify, now)
+              for pin, punch_time, status, verify in rows],
+            page_size=len(rows))
+        cron = self.env.ref('hr_zk_attendance.ir_cron_import_push_punches',
+                            raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    @api.model
+    def _cron_import_push_punches(self):
+        """Import the buffered punches in micro-batches.
+
+        Each batch is claimed with ``FOR UPDATE SKIP LOCKED``, imported
+        through the bulk pipeline of its device (employee mapping,
+        timezone conversion and ``(device_id_num, punching_time)`` dedup),
+        removed from the buffer and committed.
+
+        PINs without employee follow the ``unknown_user_policy`` of the
+        device: employees are created, named after the PIN since pushed
+        punches carry no name, or the users are queued in zk.unmapped.user
+        and their punches held in the buffer until
+        :meth:`_release_held` is called for them.
+        """
+        cr = self.env.cr
+        Device = self.env['biometric.device.details'].sudo()
+        Employee = self.env['hr.employee']
+        while True:
+            cr.execute("""
+                SELECT id, device_id, device_id_num, device_time, status,
+                    verify
+                FROM zk_push_punch
+                WHERE held IS NOT TRUE
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            """, (PUSH_BATCH_SIZE,))
+            rows = cr.fetchall()
+            if not rows:
+                break
+            by_device = defaultdict(list)
+            for punch_id, device_id, pin, device_time, status, verify in rows:
+                by_device[device_id].append((punch_id, PushAttendance(
+                    pin, device_time, verify, status, pin)))
+            imported = 0
+            held_ids = []
+            for device in Device.browse(list(by_device)):
+                punches = by_device[device.id]
+                employee_map = Employee._get_device_employee_map()
+                unknown = {record.user_id for _id, record in punches
+                           if record.user_id not in employee_map}
+                if unknown:
+                    device._provision_device_users([
+                        SnapshotUser(0, pin, pin) for pin in unknown])
+                    pending = set(self.env['zk.unmapped.user'].sudo().search([
+                        ('device_id', '=', device.id),
+                        ('device_id_num', 'in', list(unknown)),
+                        ('state', '=', 'pending'),
+                    ]).mapped('device_id_num'))
+                    held_ids += [punch_id for punch_id, record in punches
+                                 if record.user_id in pending]
+                stats = device._import_attendance(
+                    [record for _id, record in punches])
+                imported += stats['imported']
+            if held_ids:
+                cr.execute("UPDATE zk_push_punch SET held = TRUE "
+                           "WHERE id = ANY(%s)", (held_ids,))
+            held = set(held_ids)
+            cr.execute("DELETE FROM zk_push_punch WHERE id = ANY(%s)",
+                       ([row[0] for row in rows if row[0] not in held],))
+            if imported:
+                Device._trigger_pairing()
+            cr.commit()
+            _logger.info("Imported %s of %s pushed punches", imported,
+                         len(rows))
+
+    @api.model
+    def _release_held(self, unmapped_users, drop=False):
+        """Release the punches held for reviewed users
+
+        :param unmapped_users: zk.unmapped.user records
+        :param drop: delete the punches, for ignored users, instead of
+            scheduling their import
+        """
+        if not unmapped_users:
+            return
+        device_ids = [user.device_id.id for user in unmapped_users]
+        pins = [user.device_id_num for user in unmapped_users]
+        self.flush_model()
+        params = {'device_ids': device_ids, 'pins': pins}
+        if drop:
+            self.env.cr.execute("""
+                DELETE FROM zk_push_punch p
+                USING unnest(%(device_ids)s::int[], %(pins)s::varchar[])
+                    AS u(device_id, pin)
+                WHERE p.held AND p.device_id = u.device_id
+                AND p.device_id_num = u.pin
+            """, params)
+        else:
+            self.env.cr.execute("""
+                UPDATE zk_push_punch p SET held = FALSE
+                FROM unnest(%(device_ids)s::int[], %(pins)s::varchar[])
+                    AS u(device_id, pin)
+                WHERE p.held AND p.device_id = u.device_id
+                AND p.device_id_num = u.pin
+            """, params)
+        released = self.env.cr.rowcount
+        self.invalidate_model()
+        if released and not drop:
+            cron = self.env.ref('hr_zk_attendance.ir_cron_import_push_punches',
+                                raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+
+class ZkUnmappedUser(models.Model):
+    """Users enrolled on a device without a matching employee, queued for
+    review when the device does not create employees automatically"""
+    _name = 'zk.unmapped.user'
+    _description = 'Unmapped Biometric Device User'
+    _order = 'device_id, device_id_num'
+
+    device_id = fields.Many2one('biometric.device.details', string='Device',
+                                required=True, ondelete='cascade',
+                                help='Device the user is enrolled on')
+    device_id_num = fields.Char(string='Biometric Device ID', required=True,
+                                help='User ID on the device')
+    name = fields.Char(string='Name', help='User name on the device')
+    employee_id = fields.Many2one('hr.employee', string='Employee',
+                                  help='Existing employee to link the user '
+                                       'to, leave empty to create one')
+    company_id = fields.Many2one(related='device_id.company_id', store=True,
+                                 string='Company')
+    state = fields.Selection([('pending', 'Pending'), ('mapped', 'Mapped'),
+                              ('ignored', 'Ignored')], string='Status',
+                             default='pending', required=True)
+
+    _sql_constraints = [
+        ('unique_device_user',
+         'UNIQUE(device_id, device_id_num)',
+         'This device user is already queued!')
+    ]
+
+    @api.model
+    def _queue_users(self, device, users):
+        """Queue the given device users, skipping those already queued
+
+        :param device: biometric.device.details record
+        :param users: pyzk ``User`` records without employee
+        :return: number of newly queued users
+        """
+        queued = set(self.search([('device_id', '=', device.id)])
+                     .mapped('device_id_num'))
+        new_users = [user for user in users if user.user_id not in queued]
+        self.create([{
+            'device_id': device.id,
+            'device_id_num': user.user_id,
+            'name': user.name,
+        } for user in new_users])
+        return len(new_users)
+
+    def action_map_users(self):
+        """Link the selected users to their employee, creating the missing
+        employees in one batch, and import the punches skipped so far.
+
+        Their punches are replayed from the raw logs stored since the users
+        were queued, which still hold them when the device has been
+        cleared meanwhile (see
+        :meth:`biometric.device.details._clear_device_log`), the held
+        pushed punches are released and the devices are resynced.
+        """
+        pending = self.filtered(lambda user: user.state == 'pending')
+        if not pending:
+            raise UserError(_('Select pending users to map.'))
+        to_create = pending.filtered(lambda user: not user.employee_id)
+        self.env['hr.employee'].create([{
+            'name': user.name or user.device_id_num,
+            'device_id_num': user.device_id_num,
+            'company_id': user.company_id.id or self.env.company.id,
+        } for user in to_create])
+        for user in pending - to_create:
+            user.employee_id.device_id_num = user.device_id_num
+        pending.write({'state': 'mapped'})
+        RawLog = self.env['biometric.device.raw.log'].sudo()
+        for device in pending.device_id:
+            device_users = pending.filtered(lambda user: user.device_id == device)
+            RawLog.search([
+                ('device_id', '=', device.id),
+                ('create_date', '>=', min(device_users.mapped('create_date'))),
+            ])._replay(set(device_users.mapped('device_id_num')))
+        self.env['zk.push.punch'].sudo()._release_held(pending)
+        pending.device_id.action_reset_watermark()
+
+    def action_ignore(self):
+        """Keep skipping the punches of the selected users, dropping those
+        held in the push buffer"""
+        self.env['zk.push.punch'].sudo()._release_held(
+            self.filtered(lambda user: user.state == 'pending'), drop=True)
+        self.write({'state': 'ignored'})
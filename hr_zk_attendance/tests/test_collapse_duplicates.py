@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+from datetime import datetime, timedelta
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestCollapseDuplicates(TransactionCase):
+    """Collapsing of punches repeated within the duplicate window"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Punch = cls.env['zk.machine.attendance']
+        cls.employee = cls.env['hr.employee'].create({'name': 'Duplicate Test'})
+        cls.start = datetime(2025, 3, 3, 8, 0)
+        cls.Punch.create({
+            'employee_id': cls.employee.id,
+            'device_id_num': '101',
+            'punching_time': cls.start,
+            'punch_type': '0',
+        })
+        cls.env['ir.config_parameter'].sudo().set_param(
+            'hr_zk_attendance.duplicate_window', 30)
+
+    def _vals(self, seconds, device_id_num='101'):
+        return {'employee_id': self.employee.id,
+                'device_id_num': device_id_num,
+                'punching_time': self.start + timedelta(seconds=seconds),
+                'punch_type': '0'}
+
+    def test_mark(self):
+        result, duplicates = self.Punch._collapse_duplicates([
+            self._vals(0), self._vals(10, '102'), self._vals(60),
+            self._vals(75, '102')])
+        self.assertEqual(duplicates, 2)
+        self.assertEqual([(vals['punching_time'], vals['punch_type'])
+                          for vals in result], [
+            (self.start + timedelta(seconds=10), '255'),
+            (self.start + timedelta(seconds=60), '0'),
+            (self.start + timedelta(seconds=75), '255'),
+        ])
+
+    def test_drop(self):
+        self.env['ir.config_parameter'].sudo().set_param(
+            'hr_zk_attendance.duplicate_mode', 'drop')
+        result, duplicates = self.Punch._collapse_duplicates([
+            self._vals(10, '102'), self._vals(60)])
+        self.assertEqual(duplicates, 1)
+        self.assertEqual([vals['punching_time'] for vals in result],
+                         [self.start + timedelta(seconds=60)])
+
+    def test_stored_punches_not_counted(self):
+        # a full resync presents the stored punch again, it is neither
+        # kept nor counted as a duplicate
+        result, duplicates = self.Punch._collapse_duplicates([self._vals(0)])
+        self.assertEqual((result, duplicates), ([], 0))
+        # a stored duplicate does not open a new window
+        self.Punch.create(dict(self._vals(20, '102'), punch_type='255'))
+        result, duplicates = self.Punch._collapse_duplicates([
+            self._vals(20, '102'), self._vals(40)])
+        self.assertEqual(duplicates, 0)
+        self.assertEqual([vals['punching_time'] for vals in result],
+                         [self.start + timedelta(seconds=40)])
+
+    def test_disabled(self):
+        self.env['ir.config_parameter'].sudo().set_param(
+            'hr_zk_attendance.duplicate_window', 0)
+        vals_list = [self._vals(0), self._vals(10, '102')]
+        self.assertEqual(self.Punch._collapse_duplicates(vals_list),
+                         (vals_list, 0))
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestPairPunches(TransactionCase):
+    """Pairing of the punches into hr.attendance intervals"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Punch = cls.env['zk.machine.attendance']
+        cls.Attendance = cls.env['hr.attendance']
+        cls.employee = cls.env['hr.employee'].create({'name': 'Pairing Test'})
+        cls.other = cls.env['hr.employee'].create({'name': 'Pairing Other'})
+        cls.env['ir.config_parameter'].sudo().set_param(
+            'hr_zk_attendance.max_attendance_hours', 16)
+
+    def _punch(self, punching_time, punch_type, employee=None):
+        employee = employee or self.employee
+        return self.Punch.create({
+            'employee_id': employee.id,
+            'device_id_num': str(employee.id),
+            'punching_time': punching_time,
+            'punch_type': punch_type,
+        })
+
+    def _intervals(self, employee=None):
+        return self.Attendance.search(
+            [('employee_id', '=', (employee or self.employee).id)],
+            order='check_in').mapped(lambda a: (a.check_in, a.check_out))
+
+    def test_plan_intervals(self):
+        day = datetime(2025, 3, 3)
+        punches = self._punch(day.replace(hour=8), '0') \
+            | self._punch(day.replace(hour=8, minute=1), '255') \
+            | self._punch(day.replace(hour=12), '2') \
+            | self._punch(day.replace(hour=13), '3') \
+            | self._punch(day.replace(hour=17), '1') \
+            | self._punch(day.replace(hour=18), '1') \
+            | self._punch(day + timedelta(days=2, hours=8), '0') \
+            | self._punch(day + timedelta(days=3, hours=8), '0')
+        intervals = self.Punch._plan_intervals(
+            punches.sorted('punching_time'), None, timedelta(hours=16))
+        self.assertEqual([(i['check_in'], i['check_out']) for i in intervals], [
+            (day.replace(hour=8), day.replace(hour=12)),
+            (day.replace(hour=13), day.replace(hour=18)),
+            # left open longer than the maximum, closed at its check in
+            (day + timedelta(days=2, hours=8), day + timedelta(days=2, hours=8)),
+            (day + timedelta(days=3, hours=8), False),
+        ])
+        self.assertNotIn(punches[1].id, intervals[0]['punch_ids'])
+
+    def test_pair_punches(self):
+        day = datetime(2025, 3, 3)
+        punches = self._punch(day.replace(hour=8), '0') \
+            | self._punch(day.replace(hour=17), '1')
+        punches._pair_punches()
+        self.assertEqual(self._intervals(),
+                         [(day.replace(hour=8), day.replace(hour=17))])
+        self.assertTrue(all(punches.mapped('is_paired')))
+        self.assertEqual(len(punches.hr_attendance_id), 1)
+
+    def test_late_punches_replan(self):
+        day = datetime(2025, 3, 4)
+        (self._punch(day.replace(hour=8), '0')
+         | self._punch(day.replace(hour=17), '1'))._pair_punches()
+        # the previous day arrives later, e.g. from a device back online
+        late = self._punch(day.replace(day=3, hour=8), '0') \
+            | self._punch(day.replace(day=3, hour=17), '1')
+        late._pair_punches()
+        self.assertEqual(self._intervals(), [
+            (day.replace(day=3, hour=8), day.replace(day=3, hour=17)),
+            (day.replace(hour=8), day.replace(hour=17)),
+        ])
+        self.assertTrue(all(late.mapped('is_paired')))
+        self.assertEqual(len(late.hr_attendance_id), 1)
+        self.assertFalse(self.Punch.search([
+            ('employee_id', '=', self.employee.id),
+            ('hr_attendance_id', '=', False)]))
+
+    def test_late_punches_review(self):
+        day = datetime(2025, 3, 4)
+        manual = self.Attendance.create({
+            'employee_id': self.employee.id,
+            'check_in': day.replace(hour=8),
+            'check_out': day.replace(hour=17),
+        })
+        self.assertIsNone(self.Punch._get_replan(
+            self.employee.id, day.replace(day=3, hour=8)))
+        late = self._punch(day.replace(day=3, hour=8), '0')
+        late._pair_punches()
+        self.assertTrue(late.pairing_review)
+        self.assertFalse(late.is_paired)
+        self.assertEqual(self.Attendance.search(
+            [('employee_id', '=', self.employee.id)]), manual)
+
+    def test_failed_employee_left_unpaired(self):
+        day = datetime(2025, 3, 3)
+        punches = self._punch(day.replace(hour=8), '0') \
+            | self._punch(day.replace(hour=17), '1')
+        other_punches = self._punch(day.replace(hour=8), '0', self.other) \
+            | self._punch(day.replace(hour=17), '1', self.other)
+        Punch = type(self.Punch)
+        apply_plans = Punch._apply_interval_plans
+
+        def _apply_interval_plans(self, plans):
+            if any(plan[0] == other_punches.employee_id.id for plan in plans):
+                raise ValidationError("Overlapping attendance")
+            return apply_plans(self, plans)
+
+        with patch.object(Punch, '_apply_interval_plans', _apply_interval_plans):
+            (punches | other_punches)._pair_punches()
+        self.assertTrue(all(punches.mapped('is_paired')))
+        self.assertEqual(len(self._intervals()), 1)
+        self.assertFalse(any(other_punches.mapped('is_paired')))
+        self.assertFalse(other_punches.hr_attendance_id)
+        self.assertFalse(self._intervals(self.other))
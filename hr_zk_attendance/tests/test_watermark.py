@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import datetime
+from struct import pack
+
+from odoo.tests.common import BaseCase
+
+from ..models.biometric_device_details import is_log_replaced, record_time
+from .test_zk_stream import encode_time
+
+
+class TestWatermark(BaseCase):
+    """Detection of device logs cleared since the last import"""
+
+    def _log(self, *times):
+        return b''.join(pack('<I4sBB6x', 101, encode_time(timestamp), 1, 0)
+                        for timestamp in times)
+
+    def test_record_time(self):
+        data = self._log(datetime.datetime(2025, 6, 2, 8, 0),
+                         datetime.datetime(2025, 6, 2, 17, 0))
+        self.assertEqual(record_time(data, 16, 1, 'Europe/Brussels', 'earliest'),
+                         datetime.datetime(2025, 6, 2, 15, 0))
+
+    def test_is_log_replaced(self):
+        first = datetime.datetime(2025, 6, 2, 8, 0)
+        second = datetime.datetime(2025, 6, 2, 17, 0)
+        data = self._log(first, second, datetime.datetime(2025, 6, 3, 8, 0))
+        # appended records only
+        self.assertFalse(is_log_replaced(data, 16, 2, second, 'UTC', 'earliest'))
+        self.assertFalse(is_log_replaced(data, 16, 0, False, 'UTC', 'earliest'))
+        # shorter than the watermark
+        self.assertTrue(is_log_replaced(data, 16, 4, second, 'UTC', 'earliest'))
+        # cleared and refilled past the watermark
+        refilled = self._log(datetime.datetime(2025, 7, 1, 8, 0),
+                             datetime.datetime(2025, 7, 1, 9, 0),
+                             datetime.datetime(2025, 7, 1, 10, 0))
+        self.assertTrue(is_log_replaced(refilled, 16, 2, second, 'UTC', 'earliest'))
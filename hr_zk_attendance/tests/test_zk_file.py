@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import datetime
+import io
+
+from odoo.tests.common import BaseCase
+
+from ..tools.zk_file import (ParseStats, iter_attlog, iter_csv,
+                             iter_file_records)
+
+
+class TestZkFile(BaseCase):
+    """Parsing of the attendance files exported to USB sticks"""
+
+    def test_attlog(self):
+        stats = ParseStats()
+        records = list(iter_attlog([
+            ' 101\t2025-03-03 08:01:02\t1\t0\t1\t0\n',
+            '102\t2025-03-03 17:30:00\t1\n',
+            '\n',
+            '103\tnot a time\t1\t0\t1\n',
+            '104\n',
+        ], stats))
+        self.assertEqual(stats.lines, 4)
+        self.assertEqual(stats.invalid, 2)
+        self.assertEqual([r.user_id for r in records], ['101', '102'])
+        self.assertEqual(records[0].timestamp,
+                         datetime.datetime(2025, 3, 3, 8, 1, 2))
+        self.assertEqual((records[0].punch, records[0].status), (0, 1))
+        # missing state and verify columns fall back to check in / finger
+        self.assertEqual((records[1].punch, records[1].status), (0, 1))
+
+    def test_csv(self):
+        stats = ParseStats()
+        records = list(iter_csv([
+            'AC-No.,Name,Time,State\n',
+            '101,Alice,03/03/2025 08:01:02,0\n',
+            '102,Bob,2025-03-03 17:30,1\n',
+            ',Nobody,2025-03-03 17:30,1\n',
+            '103,Carol,yesterday,1\n',
+            ',,,\n',
+        ], stats))
+        self.assertEqual(stats.lines, 4)
+        self.assertEqual(stats.invalid, 2)
+        self.assertEqual([r.user_id for r in records], ['101', '102'])
+        self.assertEqual(records[0].timestamp,
+                         datetime.datetime(2025, 3, 3, 8, 1, 2))
+        self.assertEqual(records[1].punch, 1)
+        self.assertEqual(records[1].status, 1)
+
+    def test_csv_without_columns(self):
+        with self.assertRaises(ValueError):
+            list(iter_csv(['Name,State\n', 'Alice,0\n'], ParseStats()))
+
+    def test_auto_format(self):
+        stats = ParseStats()
+        attlog = io.BytesIO(b'\xef\xbb\xbf101\t2025-03-03 08:01:02\t1\t0\t1\n'
+                            b'102\t2025-03-03 08:02:00\t1\t0\t1\n')
+        records = list(iter_file_records(attlog, 'auto', stats))
+        self.assertEqual([r.user_id for r in records], ['101', '102'])
+        csv_file = io.BytesIO(b'\xef\xbb\xbfpin,timestamp\r\n'
+                              b'101,2025-03-03 08:01:02\r\n')
+        records = list(iter_file_records(csv_file, 'auto', stats))
+        self.assertEqual([r.user_id for r in records], ['101'])
+        self.assertEqual(stats.lines, 3)
+        self.assertEqual(stats.invalid, 0)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import datetime
+
+from odoo.tests.common import BaseCase
+
+from ..tools.zk_push import handshake_options, parse_attlog
+
+
+class TestZkPush(BaseCase):
+    """Parsing of the tables posted by push devices"""
+
+    def test_parse_attlog(self):
+        rows, invalid = parse_attlog(
+            '101\t2025-03-03 08:01:02\t0\t15\t0\t0\n'
+            '102\t2025-03-03 17:30:00\n'
+            '\n'
+            '103\t03/03/2025 17:30\t1\t1\n'
+            '104\t2025-03-03 17:31:00\tx\t1\n'
+            'garbage\n')
+        self.assertEqual(rows, [
+            ('101', datetime.datetime(2025, 3, 3, 8, 1, 2), 0, 15),
+            ('102', datetime.datetime(2025, 3, 3, 17, 30), 0, 1),
+        ])
+        self.assertEqual(invalid, 3)
+
+    def test_handshake_options(self):
+        options = handshake_options('ABC123', delay=30).splitlines()
+        self.assertEqual(options[0], 'GET OPTION FROM: ABC123')
+        self.assertIn('Delay=30', options)
+        self.assertIn('Realtime=1', options)
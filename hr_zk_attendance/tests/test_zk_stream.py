@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import datetime
+from struct import pack
+
+from zk.user import User
+
+from odoo.tests.common import BaseCase
+
+from ..tools.zk_stream import (decode_time, has_unknown_users,
+                               iter_attendance_batches)
+
+
+def encode_time(timestamp):
+    """Pack a datetime the way the devices store it"""
+    t = (timestamp.year - 2000) * 12 + timestamp.month - 1
+    t = t * 31 + timestamp.day - 1
+    t = (t * 24 + timestamp.hour) * 60 + timestamp.minute
+    return pack('<I', t * 60 + timestamp.second)
+
+
+class TestZkStream(BaseCase):
+    """Decoding of the raw attendance log buffer"""
+
+    def setUp(self):
+        super().setUp()
+        self.times = [datetime.datetime(2025, 1, 31, 8, 0, 5),
+                      datetime.datetime(2025, 2, 1, 17, 30, 59),
+                      datetime.datetime(2025, 12, 31, 23, 59, 0)]
+        self.users = [User(1, 'Alice', 0, user_id='101'),
+                      User(2, 'Bob', 0, user_id='102')]
+
+    def test_decode_time(self):
+        for timestamp in self.times:
+            self.assertEqual(decode_time(encode_time(timestamp)), timestamp)
+
+    def test_8_byte_records(self):
+        data = b''.join(pack('<HB4sB', uid, 1, encode_time(timestamp), 0)
+                        for uid, timestamp in zip((1, 2, 3), self.times))
+        batches = list(iter_attendance_batches(data, 8, self.users, 2))
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        records = batches[0] + batches[1]
+        # the uid resolves to the user id, unknown uids are kept as is
+        self.assertEqual([r.user_id for r in records], ['101', '102', '3'])
+        self.assertEqual([r.timestamp for r in records], self.times)
+        self.assertTrue(has_unknown_users(data, 8, self.users))
+        self.assertFalse(has_unknown_users(data[:16], 8, self.users))
+
+    def test_16_byte_records(self):
+        data = b''.join(pack('<I4sBB6x', user_id, encode_time(timestamp), 15, 1)
+                        for user_id, timestamp in zip((101, 102, 103), self.times))
+        records = [record for batch in iter_attendance_batches(
+            data, 16, self.users, 10, start=1) for record in batch]
+        self.assertEqual([r.user_id for r in records], ['102', '103'])
+        self.assertEqual([r.timestamp for r in records], self.times[1:])
+        self.assertEqual(records[0].status, 15)
+        self.assertEqual(records[0].punch, 1)
+        self.assertTrue(has_unknown_users(data, 16, self.users, start=2))
+        self.assertFalse(has_unknown_users(data[:32], 16, self.users))
+
+    def test_40_byte_records(self):
+        data = b''.join(pack('<H24sB4sB8x', uid, user_id, 1,
+                             encode_time(timestamp), 4)
+                        for uid, user_id, timestamp in zip(
+                            (1, 2, 3), (b'101', b'102', b'ABC'), self.times))
+        records = [record for batch in iter_attendance_batches(
+            data, 40, self.users, 10) for record in batch]
+        self.assertEqual([r.user_id for r in records], ['101', '102', 'ABC'])
+        self.assertEqual([r.timestamp for r in records], self.times)
+        self.assertEqual(records[2].punch, 4)
+        self.assertTrue(has_unknown_users(data, 40, self.users))
+        self.assertFalse(has_unknown_users(data[:80], 40, self.users))
+
+    def test_incomplete_record_ignored(self):
+        data = pack('<HB4sB', 1, 1, encode_time(self.times[0]), 0) + b'\x01\x00'
+        records = [record for batch in iter_attendance_batches(
+            data, 8, self.users, 10) for record in batch]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(list(iter_attendance_batches(data, 0, self.users, 10)), [])
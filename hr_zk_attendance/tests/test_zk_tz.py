@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+import datetime
+
+from odoo.tests.common import BaseCase
+
+from ..tools.zk_tz import to_utc
+
+
+class TestZkTz(BaseCase):
+    """Conversion of device times to UTC around DST changes"""
+
+    def test_regular_times(self):
+        times = [datetime.datetime(2025, 6, 2, 8, 15),
+                 datetime.datetime(2025, 6, 2, 8, 45),
+                 datetime.datetime(2025, 1, 6, 8, 15)]
+        self.assertEqual(to_utc(times, 'Europe/Brussels'), [
+            datetime.datetime(2025, 6, 2, 6, 15),
+            datetime.datetime(2025, 6, 2, 6, 45),
+            datetime.datetime(2025, 1, 6, 7, 15),
+        ])
+        self.assertEqual(to_utc(times, 'UTC'), times)
+        self.assertEqual(to_utc(times, False), times)
+
+    def test_ambiguous_time(self):
+        # 02:30 happens twice on 2025-10-26 in Brussels, at +02:00 and +01:00
+        times = [datetime.datetime(2025, 10, 26, 2, 30)]
+        self.assertEqual(to_utc(times, 'Europe/Brussels', 'earliest'),
+                         [datetime.datetime(2025, 10, 26, 0, 30)])
+        self.assertEqual(to_utc(times, 'Europe/Brussels', 'latest'),
+                         [datetime.datetime(2025, 10, 26, 1, 30)])
+
+    def test_nonexistent_time(self):
+        # 02:30 is skipped on 2025-03-30 in Brussels
+        times = [datetime.datetime(2025, 3, 30, 2, 30),
+                 datetime.datetime(2025, 3, 30, 3, 30)]
+        self.assertEqual(to_utc(times, 'Europe/Brussels', 'earliest'), [
+            datetime.datetime(2025, 3, 30, 0, 30),
+            datetime.datetime(2025, 3, 30, 1, 30),
+        ])
+        self.assertEqual(to_utc(times, 'Europe/Brussels', 'latest'), [
+            datetime.datetime(2025, 3, 30, 1, 30),
+            datetime.datetime(2025, 3, 30, 1, 30),
+        ])
+
+    def test_hours_around_transition(self):
+        times = [datetime.datetime(2025, 3, 30, 1, 59, 59),
+                 datetime.datetime(2025, 3, 30, 3, 0)]
+        self.assertEqual(to_utc(times, 'Europe/Brussels'), [
+            datetime.datetime(2025, 3, 30, 0, 59, 59),
+            datetime.datetime(2025, 3, 30, 1, 0),
+        ])
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+"""Benchmarks of the device synchronization hot paths.
+
+Run from an Odoo shell on a disposable database::
+
+    $ odoo-bin shell -d bench
+    >>> from odoo.addons.hr_zk_attendance.tools.benchmark import run_benchmarks
+    >>> run_benchmarks(env)
+
+Every scenario builds its devices on :class:`..fake_zk.FakeZK`, runs
+``repeat`` times and is rolled back after each run (commits done by the
+code under test are disabled), so results are repeatable for a given
+seed. Reported figures are the best wall time, the SQL queries issued,
+the rows imported and the peak Python memory, the latter measured by an
+additional run under ``tracemalloc``.
+"""
+import contextlib
+import datetime
+import json
+import logging
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from . import zk_pool
+from .fake_zk import FakeDevice, FakeZK
+from ..models import biometric_device_details
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_SCENARIOS = [
+    {'name': 'download 10k punches', 'type': 'download',
+     'users': 200, 'punches': 10000},
+    {'name': 'download 10k, first sync', 'type': 'download',
+     'users': 200, 'punches': 10000, 'provision': True},
+    {'name': 'download 10k into 200k rows', 'type': 'download',
+     'users': 200, 'punches': 10000, 'existing': 200000},
+    {'name': 'download 10k, 5% duplicates', 'type': 'download',
+     'users': 200, 'punches': 10000, 'duplicate_ratio': 0.05},
+    {'name': 'download 10k, DST week', 'type': 'download',
+     'users': 200, 'punches': 10000, 'tz': 'Europe/Brussels',
+     'start': datetime.datetime(2025, 3, 24)},
+    {'name': 'cron 20 devices, 2 dead', 'type': 'cron', 'devices': 20,
+     'users': 50, 'punches': 2000, 'unreachable': 2, 'latency': 0.002},
+    {'name': 'daily report over 50k punches', 'type': 'report',
+     'users': 500, 'punches': 50000},
+]
+
+
+@contextlib.contextmanager
+def _bench_environment(env):
+    """Route the device code, reachability probe included, to FakeZK and
+    keep everything rollbackable"""
+    FakeZK.reset()
+    with patch.object(zk_pool, 'ZK', FakeZK), \
+            patch.object(zk_pool, 'POOL', zk_pool.ZkSessionPool()), \
+            patch.object(biometric_device_details, 'probe', FakeZK.probe), \
+            patch.object(env.cr, 'commit', env.flush_all):
+        try:
+            yield
+        finally:
+            env.cr.rollback()
+            # the employee mapping may still hold rolled back employees
+            env.registry.clear_cache()
+            FakeZK.reset()
+
+
+def _setup(env, scenario):
+    """Create the devices and employees of a scenario
+
+    :return: biometric.device.details recordset
+    """
+    Device = env['biometric.device.details']
+    Device.search([]).write({'active': False})
+    devices = Device
+    for index in range(scenario.get('devices', 1)):
+        ip = '10.99.%s.%s' % divmod(index, 250)
+        FakeZK.register(ip, 4370, FakeDevice(
+            users=scenario.get('users', 100),
+            punches=scenario.get('punches', 1000),
+            start=scenario.get('start'),
+            duplicate_ratio=scenario.get('duplicate_ratio', 0.02),
+            seed=scenario.get('seed', 0) + index,
+            latency=scenario.get('latency', 0.0),
+            connect_delay=scenario.get('connect_delay', 1.0),
+            unreachable=index < scenario.get('unreachable', 0)))
+        devices |= Device.create({
+            'name': 'Bench %s' % ip,
+            'device_ip': ip,
+            'port_number': 4370,
+            'connection_timeout': 2,
+            'sync_retries': 0,
+            'session_ttl': 0,
+            'tz': scenario.get('tz') or 'UTC',
+        })
+    if not scenario.get('provision'):
+        users = FakeZK.devices[(devices[0].device_ip, 4370)].users
+        env['hr.employee'].create([{
+            'name': user.name,
+            'device_id_num': user.user_id,
+        } for user in users])
+    if scenario.get('existing'):
+        _seed_history(env, devices[0], scenario['existing'])
+    env.flush_all()
+    return devices
+
+
+def _seed_history(env, device, count):
+    """Insert ``count`` older punches to benchmark against a large table"""
+    employee_map = env['hr.employee']._get_device_employee_map()
+    employees = list(employee_map.items())
+    start = datetime.datetime(2020, 1, 1)
+    vals_list = []
+    for index in range(count):
+        device_id_num, (employee_id, company_id) = employees[index % len(employees)]
+        vals_list.append({
+            'employee_id': employee_id,
+            'company_id': company_id,
+            'device_id_num': device_id_num,
+            'punching_time': start + datetime.timedelta(minutes=index),
+            'punch_type': str(index % 2),
+            'attendance_type': '1',
+        })
+        if len(vals_list) == 5000:
+            env['zk.machine.attendance']._insert_punches(vals_list)
+            vals_list = []
+    env['zk.machine.attendance']._insert_punches(vals_list)
+
+
+def _run(env, scenario, devices):
+    """Run the measured operation of a scenario
+
+    :return: number of rows imported, or read for the report scenario
+    """
+    Attendance = env['zk.machine.attendance']
+    if scenario['type'] == 'report':
+        env['daily.attendance'].invalidate_model()
+        rows = env['daily.attendance'].search_read([], limit=80)
+        groups = env['daily.attendance'].read_group(
+            [], ['employee_id'], ['employee_id', 'punching_day:month'],
+            lazy=False)
+        return len(rows) + len(groups)
+    before = Attendance.search_count([])
+    if scenario['type'] == 'cron':
+        devices.cron_download()
+    else:
+        devices.action_download_attendance()
+    env.flush_all()
+    return Attendance.search_count([]) - before
+
+
+def run_scenario(env, scenario, repeat=3):
+    """Benchmark one scenario
+
+    :param env: Odoo environment of a disposable database
+    :param scenario: dict with ``name``, ``type`` (``download``, ``cron``
+        or ``report``) and the :class:`FakeDevice` parameters, plus
+        ``devices``, ``unreachable``, ``existing`` (rows inserted
+        beforehand), ``provision`` (let the import create employees) and
+        ``tz`` (timezone of the device log)
+    :param repeat: number of timed runs
+    :return: dict of measurements
+    """
+    result = {'name': scenario['name'], 'wall_time': None}
+    for run in range(repeat + 1):
+        trace = run == repeat
+        with _bench_environment(env):
+            devices = _setup(env, scenario)
+            if scenario['type'] == 'report':
+                devices.action_download_attendance()
+                env.flush_all()
+            if trace:
+                tracemalloc.start()
+            queries = env.cr.sql_log_count
+            start = time.perf_counter()
+            rows = _run(env, scenario, devices)
+            wall_time = time.perf_counter() - start
+            queries = env.cr.sql_log_count - queries
+            if trace:
+                result['peak_memory_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+                tracemalloc.stop()
+            elif result['wall_time'] is None or wall_time < result['wall_time']:
+                result.update(wall_time=round(wall_time, 3), queries=queries,
+                              rows=rows)
+    result['rows_per_second'] = int(result['rows'] / result['wall_time']) \
+        if result['wall_time'] else 0
+    _logger.info("Benchmark %s", result)
+    return result
+
+
+def run_benchmarks(env, scenarios=None, repeat=3, output=None):
+    """Run the benchmark scenarios and print a summary table
+
+    :param env: Odoo environment of a disposable database
+    :param scenarios: list of scenario dicts, see :func:`run_scenario`,
+        defaults to ``DEFAULT_SCENARIOS``
+    :param repeat: number of timed runs per scenario
+    :param output: optional path of a JSON file receiving the results
+    :return: list of result dicts
+    """
+    results = [run_scenario(env, scenario, repeat=repeat)
+               for scenario in scenarios or DEFAULT_SCENARIOS]
+    columns = ('name', 'wall_time', 'queries', 'rows', 'rows_per_second',
+               'peak_memory_kb')
+    print(' | '.join(columns))
+    for result in results:
+        print(' | '.join(str(result.get(column)) for column in columns))
+    if output:
+        with open(output, 'w') as file:
+            json.dump(results, file, indent=2)
+    return results
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+"""Minimal push-protocol client standing in for a ZKTeco terminal.
+
+Used to exercise ``/iclock/cdata`` locally without hardware::
+
+    python3 -m odoo.addons.hr_zk_attendance.tools.fake_push \\
+        http://localhost:8069 FAKE0001 --users 50 --punches 2000
+
+The device of the serial number must exist in Odoo with
+``push_enabled`` set.
+"""
+import argparse
+import datetime
+import random
+import time
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from .zk_push import PUSH_TIME_FORMAT
+
+
+class FakePushClient:
+    """Speaks the device side of the push protocol
+
+    :param base_url: URL of the Odoo server
+    :param serial_number: serial number sent as ``SN``
+    :param timeout: socket timeout of the requests in seconds
+    """
+
+    def __init__(self, base_url, serial_number, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.serial_number = serial_number
+        self.timeout = timeout
+
+    def _request(self, path, params, data=None):
+        url = '%s%s?%s' % (self.base_url, path,
+                           urlencode(dict(params, SN=self.serial_number)))
+        req = Request(url, data=data, method='POST' if data is not None else 'GET',
+                      headers={'Content-Type': 'text/plain'})
+        with urlopen(req, timeout=self.timeout) as response:
+            return response.read().decode()
+
+    def handshake(self):
+        """Ask for the push options, as a device does at start-up"""
+        return self._request('/iclock/cdata', {'options': 'all'})
+
+    def push(self, punches):
+        """Post an ``ATTLOG`` table
+
+        :param punches: ``(pin, local datetime, status, verify)`` tuples
+        :return: the answer of the server, ``OK: <count>`` on success
+        """
+        body = '\n'.join('%s\t%s\t%s\t%s\t0\t0' % (
+            pin, punch_time.strftime(PUSH_TIME_FORMAT), status, verify)
+            for pin, punch_time, status, verify in punches)
+        return self._request('/iclock/cdata', {'table': 'ATTLOG',
+                                               'Stamp': int(time.time())},
+                             data=body.encode())
+
+    def poll(self):
+        """Poll for commands, as a device does between uploads"""
+        return self._request('/iclock/getrequest', {})
+
+
+def generate_punches(users, count, start=None, seed=0):
+    """Generate chronological punches of users numbered from 1
+
+    :return: list of ``(pin, local datetime, status, verify)`` tuples
+    """
+    rng = random.Random(seed)
+    punch_time = start or datetime.datetime.now().replace(microsecond=0)
+    punches = []
+    for _index in range(count):
+        punch_time += datetime.timedelta(seconds=rng.randint(1, 90))
+        punches.append((str(rng.randint(1, users)), punch_time,
+                        rng.choice((0, 1, 2, 3)), rng.choice((1, 15, 4))))
+    return punches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('url', help='URL of the Odoo server')
+    parser.add_argument('serial_number', help='serial number of the device')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--punches', type=int, default=500)
+    parser.add_argument('--batch', type=int, default=100,
+                        help='punches per upload')
+    args = parser.parse_args()
+    client = FakePushClient(args.url, args.serial_number)
+    print(client.handshake())
+    punches = generate_punches(args.users, args.punches)
+    start = time.perf_counter()
+    for index in range(0, len(punches), args.batch):
+        print(client.push(punches[index:index + args.batch]))
+    elapsed = time.perf_counter() - start
+    print("Pushed %s punches in %.2fs (%d punches/s)" % (
+        len(punches), elapsed, len(punches) / elapsed if elapsed else 0))
+    print(client.poll())
+
+
+if __name__ == '__main__':
+    main()
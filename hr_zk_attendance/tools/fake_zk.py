@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+"""In-memory stand-in for ``zk.ZK`` used by the benchmarks.
+
+:class:`FakeDevice` generates a reproducible user list and attendance log
+(working days with breaks and overtime, double badging, in-log duplicates)
+and :class:`FakeZK` serves it through the subset of the pyzk API used by
+this module, including the raw buffered attendance read. Devices are
+registered by address so that every ``FakeZK`` built for the same IP and
+port talks to the same simulated terminal.
+"""
+import datetime
+import random
+import time
+from struct import pack
+
+from zk.attendance import Attendance
+from zk.exception import ZKErrorResponse, ZKNetworkError
+from zk.user import User
+
+# (hour, minute, punch type) of a working day: check in, break out,
+# break in, check out
+WORKDAY = ((8, 30, 0), (12, 30, 2), (13, 15, 3), (17, 30, 1))
+# (hour, minute, punch type) of the optional overtime: in, out
+OVERTIME = ((18, 0, 4), (20, 0, 5))
+# Verification methods (Attendance.status) picked for the punches
+VERIFY_TYPES = (1, 1, 15, 15, 4)
+
+
+def encode_time(t):
+    """Encode a datetime like the device does (see ``ZK.__encode_time``)"""
+    return (((t.year % 100) * 12 * 31 + ((t.month - 1) * 31) + t.day - 1)
+            * (24 * 60 * 60) + (t.hour * 60 + t.minute) * 60 + t.second)
+
+
+class FakeDevice:
+    """Simulated terminal holding users and a chronological punch log
+
+    :param users: number of enrolled users
+    :param punches: number of punches in the log
+    :param start: naive local datetime of the first working day
+    :param duplicate_ratio: share of punches followed by a duplicate,
+        either the same record again or a second badge a few seconds later
+    :param overtime_ratio: share of working days with overtime punches
+    :param jitter: maximum deviation in minutes of a punch from its
+        scheduled time
+    :param seed: seed of the random generator, equal parameters and seed
+        produce the same device
+    :param latency: seconds added to every command
+    :param connect_delay: seconds a connection attempt hangs before
+        failing when the device is unreachable
+    :param unreachable: simulate a dead terminal
+    """
+
+    def __init__(self, users=100, punches=1000, start=None,
+                 duplicate_ratio=0.02, overtime_ratio=0.1, jitter=20, seed=0,
+                 latency=0.0, connect_delay=1.0, unreachable=False):
+        rng = random.Random(seed)
+        self.latency = latency
+        self.connect_delay = connect_delay
+        self.unreachable = unreachable
+        self.clock_offset = datetime.timedelta()
+        self.users = [User(uid, 'Bench User %s' % uid, 0, '', '',
+                           str(1000 + uid), 0)
+                      for uid in range(1, users + 1)]
+        self.attendance = []
+        day = (start or datetime.datetime(2025, 1, 6)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        while self.users and len(self.attendance) < punches:
+            for user in self.users:
+                schedule = list(WORKDAY)
+                if rng.random() < overtime_ratio:
+                    schedule += OVERTIME
+                for hour, minute, punch in schedule:
+                    timestamp = day + datetime.timedelta(
+                        hours=hour, minutes=minute + rng.randint(-jitter, jitter),
+                        seconds=rng.randint(0, 59))
+                    status = rng.choice(VERIFY_TYPES)
+                    self.attendance.append(
+                        Attendance(user.user_id, timestamp, status, punch, user.uid))
+                    if rng.random() < duplicate_ratio:
+                        if rng.random() < 0.5:
+                            timestamp += datetime.timedelta(seconds=rng.randint(1, 5))
+                        self.attendance.append(
+                            Attendance(user.user_id, timestamp, status, punch, user.uid))
+            day += datetime.timedelta(days=1)
+        self.attendance.sort(key=lambda record: record.timestamp)
+        del self.attendance[punches:]
+
+    def attendance_buffer(self):
+        """Return the log in the 40 byte record format of the device,
+        prefixed by its total size as sent by ``read_with_buffer``"""
+        data = b''.join(
+            pack('<H24sB4sB8s', record.uid, record.user_id.encode(),
+                 record.status, pack('<I', encode_time(record.timestamp)),
+                 record.punch, b'')
+            for record in self.attendance)
+        return pack('I', len(data)) + data
+
+
+class FakeZK:
+    """Drop-in replacement of ``zk.ZK`` talking to registered
+    :class:`FakeDevice` instances"""
+    devices = {}
+
+    @classmethod
+    def register(cls, ip, port, device):
+        """Make ``device`` answer at ``ip:port``"""
+        cls.devices[(ip, port)] = device
+
+    @classmethod
+    def reset(cls):
+        """Forget all registered devices"""
+        cls.devices.clear()
+
+    @classmethod
+    def probe(cls, ip, port, force_udp=False, timeout=2.0):
+        """Replacement of :func:`..zk_probe.probe` answering from the
+        registered devices, an unreachable device hangs for its
+        ``connect_delay`` within ``timeout``"""
+        device = cls.devices.get((ip, port))
+        if device is None or device.unreachable:
+            time.sleep(min(timeout, device.connect_delay if device else 0))
+            return "Connection timed out"
+        return None
+
+    def __init__(self, ip, port=4370, timeout=60, password=0, force_udp=False,
+                 ommit_ping=False, verbose=False, encoding='UTF-8'):
+        self.address = (ip, port)
+        self.timeout = timeout
+        self.device = self.devices.get(self.address)
+        self.is_connect = False
+        self.is_enabled = True
+        self.users = self.fingers = self.records = self.cards = 0
+        self.faces = 0
+
+    def _command(self):
+        if not self.is_connect:
+            raise ZKNetworkError("not connected to %s" % self.address[0])
+        if self.device.latency:
+            time.sleep(self.device.latency)
+
+    def connect(self):
+        if self.device is None or self.device.unreachable:
+            time.sleep(min(self.timeout, self.device.connect_delay
+                           if self.device else 0))
+            raise ZKNetworkError("can't reach device (ping %s)" % self.address[0])
+        self.is_connect = True
+        self._command()
+        return self
+
+    def disconnect(self):
+        self._command()
+        self.is_connect = False
+        return True
+
+    def enable_device(self):
+        self._command()
+        self.is_enabled = True
+        return True
+
+    def disable_device(self):
+        self._command()
+        self.is_enabled = False
+        return True
+
+    def read_sizes(self):
+        self._command()
+        self.users = len(self.device.users)
+        self.records = len(self.device.attendance)
+        return True
+
+    def free_data(self):
+        self._command()
+        return True
+
+    def refresh_data(self):
+        self._command()
+        return True
+
+    def read_with_buffer(self, command, fct=0, ext=0):
+        self._command()
+        data = self.device.attendance_buffer()
+        return data, len(data)
+
+    def get_users(self):
+        self.read_sizes()
+        return list(self.device.users)
+
+    def get_attendance(self):
+        self.read_sizes()
+        return list(self.device.attendance)
+
+    def clear_attendance(self):
+        self._command()
+        self.device.attendance = []
+        return True
+
+    def get_time(self):
+        self._command()
+        return (datetime.datetime.now() + self.device.clock_offset).replace(
+            microsecond=0)
+
+    def set_time(self, timestamp):
+        self._command()
+        self.device.clock_offset = timestamp - datetime.datetime.now()
+        return True
+
+    def restart(self):
+        self._command()
+        self.is_connect = False
+        return True
+
+    def set_user(self, uid=None, name='', privilege=0, password='',
+                 group_id='', user_id='', card=0):
+        self._command()
+        if uid is None:
+            uid = max((user.uid for user in self.device.users), default=0) + 1
+        self.device.users = [user for user in self.device.users
+                             if user.uid != uid]
+        self.device.users.append(User(uid, name, privilege, password,
+                                      group_id, user_id or str(uid), card))
+        return True
+
+    def delete_user(self, uid=0, user_id=''):
+        self._command()
+        users = [user for user in self.device.users
+                 if user.uid == uid or (user_id and user.user_id == str(user_id))]
+        if not users:
+            raise ZKErrorResponse("Can't delete user")
+        self.device.users = [user for user in self.device.users
+                             if user not in users]
+        return True
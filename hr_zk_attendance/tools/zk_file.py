@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+"""Streaming parsers of the attendance files exported by the devices.
+
+Terminals without a network route export their log to a USB stick, either
+as ``attlog.dat`` (``<SN>_attlog.dat``) text lines
+``PIN, time, machine, state, verify, workcode`` separated by tabs, or as
+CSV from the vendor software. Both are read line by line from a binary
+stream, so files of millions of lines never sit in memory as a whole.
+"""
+import csv
+import datetime
+import io
+
+from .zk_push import PUSH_TIME_FORMAT, PushAttendance
+
+# Accepted CSV header names of each column, lower case
+CSV_COLUMNS = {
+    'user_id': ('user_id', 'user id', 'pin', 'id', 'ac-no.', 'ac-no'),
+    'timestamp': ('timestamp', 'time', 'datetime', 'date time', 'punching_time'),
+    'punch': ('punch', 'state', 'status', 'punch_type'),
+    'verify': ('verify', 'verify_type', 'verification', 'attendance_type'),
+}
+CSV_TIME_FORMATS = (PUSH_TIME_FORMAT, '%Y-%m-%d %H:%M', '%d/%m/%Y %H:%M:%S',
+                    '%d/%m/%Y %H:%M', '%m/%d/%Y %H:%M:%S')
+
+
+class ParseStats:
+    """Counters updated while a file is parsed"""
+    __slots__ = ('lines', 'invalid')
+
+    def __init__(self):
+        self.lines = 0
+        self.invalid = 0
+
+
+def _parse_time(value):
+    value = value.strip()
+    for time_format in CSV_TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, time_format)
+        except ValueError:
+            continue
+    raise ValueError("Unknown time format: %s" % value)
+
+
+def _int(value, default):
+    value = (value or '').strip()
+    return int(value) if value else default
+
+
+def iter_attlog(text, stats):
+    """Parse ``attlog.dat`` lines
+
+    :param text: iterable of text lines
+    :param stats: :class:`ParseStats` updated while parsing
+    :return: generator of :class:`PushAttendance` records
+    """
+    for line in text:
+        fields = line.strip().split('\t')
+        if not fields[0]:
+            continue
+        stats.lines += 1
+        try:
+            punch_time = datetime.datetime.strptime(fields[1].strip(),
+                                                    PUSH_TIME_FORMAT)
+            punch = _int(fields[3], 0) if len(fields) > 3 else 0
+            verify = _int(fields[4], 1) if len(fields) > 4 else 1
+        except (IndexError, ValueError):
+            stats.invalid += 1
+            continue
+        user_id = fields[0].strip()
+        yield PushAttendance(user_id, punch_time, verify, punch, user_id)
+
+
+def iter_csv(text, stats):
+    """Parse CSV lines with a header row naming the columns, see
+    :data:`CSV_COLUMNS`
+
+    :param text: iterable of text lines
+    :param stats: :class:`ParseStats` updated while parsing
+    :return: generator of :class:`PushAttendance` records
+    """
+    reader = csv.reader(text)
+    header = [name.strip().lower() for name in next(reader, [])]
+    columns = {}
+    for key, names in CSV_COLUMNS.items():
+        columns[key] = next((index for index, name in enumerate(header)
+                             if name in names), None)
+    if columns['user_id'] is None or columns['timestamp'] is None:
+        raise ValueError("The CSV header must name the user id and the "
+                         "time columns")
+    for row in reader:
+        if not any(row):
+            continue
+        stats.lines += 1
+        try:
+            user_id = row[columns['user_id']].strip()
+            punch_time = _parse_time(row[columns['timestamp']])
+            punch = _int(row[columns['punch']], 0) if columns['punch'] is not None else 0
+            verify = _int(row[columns['verify']], 1) if columns['verify'] is not None else 1
+        except (IndexError, ValueError):
+            stats.invalid += 1
+            continue
+        if not user_id:
+            stats.invalid += 1
+            continue
+        yield PushAttendance(user_id, punch_time, verify, punch, user_id)
+
+
+def iter_file_records(stream, file_format, stats):
+    """Parse an exported attendance file
+
+    :param stream: binary file object
+    :param file_format: ``attlog``, ``csv`` or ``auto`` to pick the
+        format from the first line
+    :param stats: :class:`ParseStats` updated while parsing
+    :return: generator of :class:`PushAttendance` records
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='ignore',
+                            newline='')
+    if file_format == 'auto':
+        first = text.readline()
+        file_format = 'attlog' if '\t' in first else 'csv'
+        text = _chain([first], text)
+    if file_format == 'attlog':
+        return iter_attlog(text, stats)
+    return iter_csv(text, stats)
+
+
+def _chain(head, text):
+    yield from head
+    yield from text
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+"""Per-process pool of authenticated device sessions.
+
+Connecting to a ZKTeco device costs a ping, a TCP probe and a
+connect/authenticate round trip. The pool keeps one session per device
+open between calls, for at most its idle TTL, and checks it with a cheap
+command before handing it out again. A session is used by one thread at
+a time since the devices do not support concurrent commands.
+"""
+import contextlib
+import logging
+import threading
+import time
+
+try:
+    from zk import ZK
+except ImportError:
+    ZK = None
+
+_logger = logging.getLogger(__name__)
+
+
+class DeviceBusyError(Exception):
+    """Raised when a device session stays in use longer than allowed"""
+
+
+class _Session:
+    """Connection of one device together with its usage bookkeeping"""
+    __slots__ = ('lock', 'conn', 'settings', 'last_used')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.conn = None
+        self.settings = None
+        self.last_used = 0.0
+
+
+class ZkSessionPool:
+    """Thread-safe registry of open device sessions keyed by device"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    @contextlib.contextmanager
+    def connection(self, key, settings, ttl=0, busy_timeout=60):
+        """Context manager returning a connected ``ZK`` instance
+
+        :param key: hashable identifying the device, e.g. (dbname, id)
+        :param settings: keyword arguments of the ``ZK`` constructor; a
+            session opened with other settings is reconnected
+        :param ttl: seconds an idle session is kept open after use,
+            ``0`` disconnects right after use
+        :param busy_timeout: seconds to wait for another user of the
+            same device
+        """
+        self.reap()
+        with self._lock:
+            session = self._sessions.setdefault(key, _Session())
+        if not session.lock.acquire(timeout=busy_timeout):
+            raise DeviceBusyError("Device %s is busy" % settings.get('ip'))
+        try:
+            conn = self._checkout(session, settings, ttl)
+            try:
+                yield conn
+            except BaseException:
+                self._close(session)
+                raise
+            if ttl > 0:
+                session.last_used = time.monotonic()
+            else:
+                self._close(session)
+        finally:
+            session.lock.release()
+
+    def is_open(self, key):
+        """Whether an authenticated session to the device is kept open"""
+        with self._lock:
+            session = self._sessions.get(key)
+        return bool(session and session.conn is not None)
+
+    def discard(self, key):
+        """Close the session of a device, e.g. after a restart"""
+        with self._lock:
+            session = self._sessions.get(key)
+        if session and session.lock.acquire(timeout=0):
+            try:
+                self._close(session)
+            finally:
+                session.lock.release()
+
+    def reap(self):
+        """Close the idle sessions whose TTL has expired"""
+        now = time.monotonic()
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            if session.conn is None or not session.lock.acquire(blocking=False):
+                continue
+            try:
+                ttl = session.settings.get('ttl', 0) if session.settings else 0
+                if session.conn is not None and now - session.last_used > ttl:
+                    self._close(session)
+            finally:
+                session.lock.release()
+
+    def _checkout(self, session, settings, ttl):
+        settings = dict(settings, ttl=ttl)
+        conn = session.conn
+        if conn is not None and (
+                session.settings != settings
+                or time.monotonic() - session.last_used > ttl
+                or not self._is_alive(conn)):
+            self._close(session)
+            conn = None
+        if conn is None:
+            conn = ZK(settings['ip'], port=settings['port'],
+                      timeout=settings['timeout'],
+                      password=settings['password'],
+                      force_udp=settings['force_udp'],
+                      ommit_ping=settings['ommit_ping']).connect()
+            session.conn = conn
+            session.settings = settings
+        return conn
+
+    @staticmethod
+    def _is_alive(conn):
+        """Health check of a reused session with a one packet command"""
+        try:
+            return bool(conn.is_connect and conn.read_sizes())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(session):
+        conn, session.conn = session.conn, None
+        # restart/poweroff already dropped the session on the device side
+        if conn is not None and conn.is_connect:
+            try:
+                conn.disconnect()
+            except Exception as e:
+                _logger.debug("Error while closing device session: %s", e)
+
+
+POOL = ZkSessionPool()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+"""Cheap reachability probe of ZKTeco devices.
+
+A full pyzk connection may wait for the whole socket timeout, ping the
+device first and authenticate. Before paying for it, :func:`probe` checks
+within a short timeout that something answers at the device address: a
+TCP connect for TCP devices, or a bare ``CMD_CONNECT`` datagram, closed
+again with ``CMD_EXIT``, for UDP devices.
+"""
+import socket
+from struct import pack, unpack
+
+USHRT_MAX = 65535
+CMD_CONNECT = 1000
+CMD_EXIT = 1001
+
+
+def _checksum(buf):
+    """Packet checksum of the device protocol (see ``ZK.__create_checksum``)"""
+    checksum = 0
+    for index in range(0, len(buf) - 1, 2):
+        checksum += buf[index] + (buf[index + 1] << 8)
+        if checksum > USHRT_MAX:
+            checksum -= USHRT_MAX
+    if len(buf) % 2:
+        checksum += buf[-1]
+    while checksum > USHRT_MAX:
+        checksum -= USHRT_MAX
+    checksum = ~checksum
+    while checksum < 0:
+        checksum += USHRT_MAX
+    return checksum
+
+
+def _packet(command, session_id=0, reply_id=USHRT_MAX - 1):
+    """Build a command packet without payload (see ``ZK.__create_header``)"""
+    checksum = _checksum(pack('<4H', command, 0, session_id, reply_id))
+    reply_id = (reply_id + 1) % USHRT_MAX
+    return pack('<4H', command, checksum, session_id, reply_id)
+
+
+def probe(ip, port, force_udp=False, timeout=2.0):
+    """Check that a device answers at its address
+
+    :return: None when the device answers, else the reason it does not
+    """
+    try:
+        if not force_udp:
+            socket.create_connection((ip, port), timeout=timeout).close()
+            return None
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(timeout)
+            sock.sendto(_packet(CMD_CONNECT), (ip, port))
+            reply = sock.recv(1024)
+            if len(reply) < 8:
+                return "Invalid reply to the connection probe"
+            session_id = unpack('<4H', reply[:8])[2]
+            sock.sendto(_packet(CMD_EXIT, session_id, 0), (ip, port))
+        return None
+    except socket.timeout:
+        return "No answer within %ss" % timeout
+    except OSError as e:
+        return e.strerror or str(e)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+"""Parsing and replies of the ZKTeco push protocol (ADMS / iClock).
+
+Terminals with push firmware call ``/iclock/cdata`` at start-up to read
+their options, post new records to it as tab-separated text tables and
+poll ``/iclock/getrequest`` for commands. Only the ``ATTLOG`` table is
+used here; its lines are ``PIN, time, status, verify, workcode, ...``
+with the time in the local time of the device.
+"""
+import datetime
+from collections import namedtuple
+
+# Same attributes as the pyzk ``Attendance`` records consumed by the
+# import pipeline: ``status`` is the verification method and ``punch``
+# the punch state
+PushAttendance = namedtuple('PushAttendance',
+                            ['user_id', 'timestamp', 'status', 'punch', 'uid'])
+
+PUSH_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def parse_attlog(body):
+    """Parse the lines of a posted ``ATTLOG`` table
+
+    Malformed lines are skipped rather than failing the whole post, the
+    device would otherwise send the same table again forever.
+
+    :param body: decoded request body
+    :return: tuple of the list of ``(pin, time, status, verify)`` rows
+        and the number of malformed lines
+    """
+    rows = []
+    invalid = 0
+    for line in body.splitlines():
+        fields = line.strip().split('\t')
+        if len(fields) < 2 or not fields[0]:
+            if line.strip():
+                invalid += 1
+            continue
+        try:
+            punch_time = datetime.datetime.strptime(fields[1].strip(),
+                                                    PUSH_TIME_FORMAT)
+            status = int(fields[2]) if len(fields) > 2 and fields[2] else 0
+            verify = int(fields[3]) if len(fields) > 3 and fields[3] else 1
+        except ValueError:
+            invalid += 1
+            continue
+        rows.append((fields[0].strip(), punch_time, status, verify))
+    return rows, invalid
+
+
+def handshake_options(serial_number, delay=10):
+    """Return the options sent to a device asking for its configuration
+
+    The device is told to push attendance records in real time and to
+    resend everything it did not get acknowledged yet.
+    """
+    return '\n'.join([
+        'GET OPTION FROM: %s' % serial_number,
+        'ATTLOGStamp=None',
+        'OPERLOGStamp=9999',
+        'ATTPHOTOStamp=None',
+        'ErrorDelay=30',
+        'Delay=%s' % delay,
+        'TransTimes=00:00;14:05',
+        'TransInterval=1',
+        'TransFlag=TransData AttLog',
+        'Realtime=1',
+        'Encrypt=None',
+    ])
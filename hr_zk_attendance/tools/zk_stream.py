@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+"""Incremental decoding of the attendance log buffer of ZKTeco devices.
+
+``ZK.get_attendance`` decodes the whole log into a list of ``Attendance``
+objects at once, slicing the buffer for every record and reading the user
+list a second time. The helpers below read the raw log once and decode it
+lazily in fixed-size batches, so only one batch of Python objects is alive
+at a time.
+"""
+import datetime
+from struct import unpack, unpack_from
+
+try:
+    from zk import const
+    from zk.attendance import Attendance
+except ImportError:
+    const = Attendance = None
+
+
+def decode_time(raw):
+    """Decode a packed device timestamp (copied from ``ZK.__decode_time``)
+
+    :param raw: 4 bytes holding the encoded timestamp
+    :return: naive datetime in the device timezone
+    """
+    t = unpack('<I', raw)[0]
+    second = t % 60
+    t //= 60
+    minute = t % 60
+    t //= 60
+    hour = t % 24
+    t //= 24
+    day = t % 31 + 1
+    t //= 31
+    month = t % 12 + 1
+    t //= 12
+    return datetime.datetime(t + 2000, month, day, hour, minute, second)
+
+
+def read_attendance_buffer(conn):
+    """Read the raw attendance log of a connected device
+
+    :param conn: connected ``ZK`` instance
+    :return: tuple of the log bytes without the size header and the size
+        of one record, ``(b'', 0)`` when the log is empty
+    """
+    conn.read_sizes()
+    if not conn.records:
+        return b'', 0
+    data, size = conn.read_with_buffer(const.CMD_ATTLOG_RRQ)
+    if size < 4:
+        return b'', 0
+    total_size = unpack('I', data[:4])[0]
+    record_size = total_size / conn.records
+    record_size = int(record_size) if record_size in (8, 16) else 40
+    return data[4:], record_size
+
+
+def count_records(data, record_size):
+    """Return the number of complete records in a raw attendance log"""
+    return len(data) // record_size if record_size else 0
+
+
+def iter_attendance_batches(data, record_size, users, batch_size, start=0):
+    """Decode a raw attendance log in batches
+
+    :param data: log bytes as returned by :func:`read_attendance_buffer`
+    :param record_size: size of one record in bytes
+    :param users: pyzk ``User`` records, used to resolve the user of the
+        old 8 byte record format which only carries the device uid
+    :param batch_size: maximum number of records per batch
+    :param start: index of the first record to decode
+    :return: generator of lists of pyzk ``Attendance`` records
+    """
+    if not record_size:
+        return
+    user_ids = {user.uid: user.user_id for user in users}
+    view = memoryview(data)
+    batch = []
+    for offset in range(start * record_size, len(data) - record_size + 1,
+                        record_size):
+        if record_size == 8:
+            uid, status, timestamp, punch = unpack_from('<HB4sB', view, offset)
+            user_id = user_ids.get(uid, str(uid))
+        elif record_size == 16:
+            user_id, timestamp, status, punch = unpack_from('<I4sBB', view, offset)
+            uid = user_id = str(user_id)
+        else:
+            uid, user_id, status, timestamp, punch = unpack_from(
+                '<H24sB4sB', view, offset)
+            user_id = user_id.split(b'\x00')[0].decode(errors='ignore')
+        batch.append(Attendance(user_id, decode_time(timestamp), status,
+                                punch, uid))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def has_unknown_users(data, record_size, users, start=0):
+    """Tell whether records of a raw attendance log belong to users
+    missing from a user list, without decoding the records
+
+    :param data: log bytes as returned by :func:`read_attendance_buffer`
+    :param record_size: size of one record in bytes
+    :param users: pyzk ``User`` records known for the device
+    :param start: index of the first record to check
+    :return: True as soon as a record of an unknown user is found
+    """
+    if not record_size:
+        return False
+    view = memoryview(data)
+    if record_size == 8:
+        known = {user.uid for user in users}
+    else:
+        known = {user.user_id for user in users}
+    for offset in range(start * record_size, len(data) - record_size + 1,
+                        record_size):
+        if record_size == 8:
+            key = unpack_from('<H', view, offset)[0]
+        elif record_size == 16:
+            key = str(unpack_from('<I', view, offset)[0])
+        else:
+            key = bytes(view[offset + 2:offset + 26]).split(b'\x00')[0].decode(
+                errors='ignore')
+        if key not in known:
+            return True
+    return False
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+"""Batch conversion of naive device timestamps to UTC.
+
+Devices store punches as naive wall-clock times of their own timezone.
+Localizing them one by one costs a zone lookup and a bisection of the
+transition table per punch, and ``localize(is_dst=None)`` raises on the
+hour repeated or skipped at DST changes. :func:`to_utc` converts a whole
+batch instead: the UTC offset is resolved once per local hour and reused
+for every punch of that hour, and only the hours around a transition fall
+back to a per-punch conversion with an explicit ``is_dst`` policy.
+"""
+import datetime
+import functools
+
+try:
+    import pytz
+except ImportError:
+    pytz = None
+
+# Policy for local times that are ambiguous (repeated at the end of DST)
+# or nonexistent (skipped at the start of DST), as pytz ``is_dst`` values:
+# 'earliest' resolves them to the earliest possible UTC instant.
+DST_POLICIES = {'earliest': True, 'latest': False}
+
+ONE_HOUR = datetime.timedelta(hours=1)
+LAST_SECOND = datetime.timedelta(minutes=59, seconds=59)
+
+
+@functools.lru_cache(maxsize=None)
+def get_timezone(name):
+    """Return the cached pytz timezone of the given name, UTC when empty"""
+    return pytz.timezone(name or 'UTC')
+
+
+def _hour_offset(tz, hour):
+    """UTC offset shared by every second of a local hour
+
+    :return: the offset as a timedelta, or None when the hour contains a
+        DST transition and its times must be converted one by one
+    """
+    try:
+        start = tz.localize(hour, is_dst=None).utcoffset()
+        end = tz.localize(hour + LAST_SECOND, is_dst=None).utcoffset()
+    except (pytz.AmbiguousTimeError, pytz.NonExistentTimeError):
+        return None
+    return start if start == end else None
+
+
+def to_utc(timestamps, tz_name, dst_policy='earliest'):
+    """Convert naive local datetimes to naive UTC datetimes
+
+    :param timestamps: iterable of naive datetimes in the ``tz_name``
+        timezone
+    :param tz_name: name of the timezone of the timestamps
+    :param dst_policy: key of :data:`DST_POLICIES` applied to ambiguous
+        and nonexistent times
+    :return: list of naive UTC datetimes, in the order of ``timestamps``
+    """
+    tz = get_timezone(tz_name)
+    if tz is pytz.utc:
+        return list(timestamps)
+    is_dst = DST_POLICIES[dst_policy]
+    offsets = {}
+    result = []
+    for timestamp in timestamps:
+        hour = timestamp.replace(minute=0, second=0, microsecond=0)
+        if hour in offsets:
+            offset = offsets[hour]
+        else:
+            offset = offsets[hour] = _hour_offset(tz, hour)
+        if offset is None:
+            offset = tz.localize(timestamp, is_dst=is_dst).utcoffset()
+        result.append(timestamp - offset)
+    return result
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev KP (odoo@cybrosys.com)
+#
+#    This program is free software: you can modify
+#    it under the terms of the GNU Affero General Public License (AGPL) as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+################################################################################
+from odoo import fields, models, _
+
+
+class ZkAttlogImport(models.TransientModel):
+    """Upload of the attendance files exported from a device to USB, imported
+    in the background by the device job runner"""
+    _name = 'zk.attlog.import'
+    _description = 'Import Biometric Attendance File'
+
+    device_id = fields.Many2one(
+        'biometric.device.details', string='Device', required=True,
+        help='Device the file was exported from, for its timezone and '
+             'working address')
+    file = fields.Binary(string='File', required=True,
+                         help='attlog.dat or CSV file exported from the '
+                              'device')
+    filename = fields.Char(string='File Name')
+    file_format = fields.Selection(
+        [('auto', 'Detect'), ('attlog', 'attlog.dat'), ('csv', 'CSV')],
+        string='Format', default='auto', required=True,
+        help='CSV files need a header row naming the user id and time '
+             'columns')
+
+    def action_import(self):
+        """Queue the import of the file in a device job"""
+        self.ensure_one()
+        job, _created = self.env['biometric.device.job'].sudo()._enqueue(
+            self.device_id, 'file_import', {
+                'file': self.file,
+                'filename': self.filename,
+                'file_format': self.file_format,
+            })
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('%(job)s queued, the statistics of the import '
+                             'will be in the job and the sync log',
+                             job=job.display_name),
+                'type': 'info',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }